@@ -1,33 +1,84 @@
 import os
 import asyncio
 import json
+import hashlib
 import logging
-from typing import Dict, Any, Optional
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional
+import orjson
+from anyio import to_thread
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
+import logging_config
 from workflow_orchestrator import WorkflowOrchestrator
 
 # Load environment variables
 load_dotenv()
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),  # Log to console
-        logging.FileHandler("api.log")  # Also log to a file
-    ]
-)
+logging_config.configure_once()
 logger = logging.getLogger(__name__)
 
+# Size of the threadpool that runs sync endpoints such as /api/status
+THREADPOOL_SIZE = int(os.environ.get("THREADPOOL_SIZE", 100))
+
+class MessageScheduler:
+    """
+    Funnels /api/message calls into the orchestrator.
+    
+    The orchestrator holds a single conversation, so calls are admitted through
+    a semaphore rather than interleaving their state changes. Every call is
+    processed in its own turn, even one repeating the text of a call already
+    in flight, since the same text can mean something different once the
+    conversation has moved on.
+    """
+    
+    def __init__(self, orchestrator: WorkflowOrchestrator, max_concurrency: int = 1):
+        self._orchestrator = orchestrator
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def submit(self, message: str) -> str:
+        """Process a message"""
+        return await self._run(lambda: self._orchestrator.process_message(message))
+    
+    async def submit_analysis(self, url: str) -> str:
+        """Run the full analysis for a URL"""
+        return await self._run(lambda: self._orchestrator.analyze_url(url))
+    
+    async def submit_streaming(self, message: str, on_delta) -> str:
+        """Process a message, passing response text to `on_delta` as it is generated"""
+        return await self._run(lambda: self._orchestrator.process_message(message, on_delta=on_delta))
+    
+    async def _run(self, call) -> str:
+        async with self._semaphore:
+            return await call()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Configure per-process resources on startup"""
+    # Raise anyio's default 40-thread cap so sync handlers don't queue behind each other
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    
+    # Build the orchestrator once per worker, off the event loop since tool
+    # initialization does blocking file and network work
+    logger.info("Initializing WorkflowOrchestrator for API use")
+    app.state.orchestrator = await asyncio.to_thread(WorkflowOrchestrator)
+    app.state.message_scheduler = MessageScheduler(app.state.orchestrator)
+    logger.info("WorkflowOrchestrator initialized successfully")
+    yield
+    # Flush any queued log records before the process exits
+    logging_config.shutdown()
+
 app = FastAPI(
     title="Audience Andy API",
     description="API for audience segmentation and marketing strategy",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware properly
@@ -39,17 +90,67 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
-# Create a global orchestrator instance
-logger.info("Initializing WorkflowOrchestrator for API use")
-orchestrator = WorkflowOrchestrator()
-logger.info("WorkflowOrchestrator initialized successfully")
+async def get_orchestrator(request: Request) -> WorkflowOrchestrator:
+    """Return the orchestrator created for this worker in `lifespan`"""
+    return request.app.state.orchestrator
+
+async def get_message_scheduler(request: Request) -> MessageScheduler:
+    """Return the message scheduler created for this worker in `lifespan`"""
+    return request.app.state.message_scheduler
+
+# Serialized /api/status payload as (state_version, body, etag), reused until the state changes
+_status_cache = (None, b"", "")
+
+# Seconds between keep-alive comments on an idle status stream
+STATUS_STREAM_KEEPALIVE = 15.0
+
+def _status_data(orchestrator: WorkflowOrchestrator) -> Dict[str, Any]:
+    """Collect the workflow status fields from the orchestrator"""
+    if not orchestrator.conversation_history:
+        # Nothing has been collected yet, so skip the data dicts entirely
+        return {"status": "idle", "workflow_stage": orchestrator.current_workflow_stage}
+    
+    # Create a dictionary with relevant information from the orchestrator
+    return {
+        "status": "active",
+        "workflow_stage": orchestrator.current_workflow_stage,
+        "product_data": orchestrator.product_data if orchestrator.product_data else None,
+        "market_data": orchestrator.market_data if orchestrator.market_data else None,
+        "categories": orchestrator.category_data if orchestrator.category_data else None,
+        "audience_segments": orchestrator.final_results.get('audience_segments') if 'audience_segments' in orchestrator.final_results else None,
+        "strategies": orchestrator.final_results.get('marketing_strategies') if 'marketing_strategies' in orchestrator.final_results else None
+    }
+
+def _status_snapshot(orchestrator: WorkflowOrchestrator):
+    """Return the serialized status body and its ETag, rebuilding them only when the state changed"""
+    global _status_cache
+    version = orchestrator.state_version
+    cached_version, body, etag = _status_cache
+    if cached_version != version:
+        body = orjson.dumps(_status_data(orchestrator))
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        _status_cache = (version, body, etag)
+    return body, etag
 
 # Define request and response models
 class MessageRequest(BaseModel):
     message: str
 
+class StreamMessageRequest(MessageRequest):
+    start: bool = False
+
+class StartRequest(BaseModel):
+    message: Optional[str] = None
+
+class AnalyzeRequest(BaseModel):
+    url: str
+
 class MessageResponse(BaseModel):
     message: str
+
+class StartResponse(BaseModel):
+    message: str
+    messages: Optional[List[str]] = None
     
 class StatusResponse(BaseModel):
     status: str
@@ -60,55 +161,211 @@ class StatusResponse(BaseModel):
     audience_segments: Optional[Any] = None
     strategies: Optional[Any] = None
 
-@app.post("/api/start", response_model=MessageResponse)
-async def start_conversation():
-    """Start a new conversation with the assistant"""
+class MessageStatusResponse(StatusResponse):
+    message: str
+
+@app.get("/healthz")
+async def healthz():
+    """Readiness probe - only answers once startup, including orchestrator setup, has finished"""
+    return {"ok": True}
+
+# Documented via `responses` rather than `response_model` to skip per-request revalidation
+@app.post("/api/start", responses={200: {"model": StartResponse}})
+async def start_conversation(
+    request: Optional[StartRequest] = None,
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+    scheduler: MessageScheduler = Depends(get_message_scheduler)
+):
+    """Start a new conversation with the assistant
+    
+    If the request carries a first message, it is processed straight after
+    the greeting, and the reply comes back in the same response as
+    `messages` ([greeting, reply]) along with the workflow status.
+    """
     try:
         logger.info("API: Starting new conversation")
         result = await orchestrator.start_conversation()
         logger.info("API: Conversation started successfully")
-        return {"message": result}
+        if request is not None and request.message:
+            logger.info("API: Processing first message with conversation start")
+            reply = await scheduler.submit(request.message)
+            return ORJSONResponse({"message": result, "messages": [result, reply], **_status_data(orchestrator)})
+        return ORJSONResponse({"message": result})
     except Exception as e:
-        logger.error(f"API: Error starting conversation: {str(e)}", exc_info=True)
+        logger.error("API: Error starting conversation: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/message", response_model=MessageResponse)
-async def process_message(request: MessageRequest):
-    """Process a user message and get a response"""
+@app.post("/api/message", responses={200: {"model": MessageStatusResponse}})
+async def process_message(
+    request: MessageRequest,
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+    scheduler: MessageScheduler = Depends(get_message_scheduler)
+):
+    """Process a user message and get a response, along with the updated workflow status"""
     if not request.message:
         logger.warning("API: Empty message received")
         raise HTTPException(status_code=400, detail="No message provided")
     
     try:
-        logger.info(f"API: Processing message in stage: {orchestrator.current_workflow_stage}")
-        response = await orchestrator.process_message(request.message)
-        logger.info(f"API: Message processed, new stage: {orchestrator.current_workflow_stage}")
-        return {"message": response}
+        logger.info("API: Processing message in stage: %s", orchestrator.current_workflow_stage)
+        response = await scheduler.submit(request.message)
+        logger.info("API: Message processed, new stage: %s", orchestrator.current_workflow_stage)
+        return ORJSONResponse({"message": response, **_status_data(orchestrator)})
     except Exception as e:
-        logger.error(f"API: Error processing message: {str(e)}", exc_info=True)
+        logger.error("API: Error processing message: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/status", response_model=StatusResponse)
-async def get_status():
-    """Get the current status of the workflow"""
+@app.post("/api/message/stream")
+async def stream_message(
+    request: StreamMessageRequest,
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+    scheduler: MessageScheduler = Depends(get_message_scheduler)
+):
+    """
+    Process a user message, streaming the response as Server-Sent Events.
+    
+    Each `data` event carries a `delta` of response text as the model
+    generates it, and a `status` event carries the workflow status whenever
+    it changes (e.g. as an analysis moves through its stages). A final
+    `done` event carries the full message and the updated workflow status,
+    or an `error` event if processing failed.
+    
+    With `start` set, the conversation is started first and its greeting is
+    sent as a `greeting` event ahead of the response, so a client can open
+    the conversation and send its first message in one streamed request.
+    """
+    if not request.message:
+        logger.warning("API: Empty message received")
+        raise HTTPException(status_code=400, detail="No message provided")
+    
+    logger.info("API: Streaming message in stage: %s", orchestrator.current_workflow_stage)
+    # Items are ("greeting", text), ("delta", text) or ("status", None), then None once processing is done
+    updates: asyncio.Queue = asyncio.Queue()
+    
+    async def process():
+        if request.start:
+            logger.info("API: Starting new conversation")
+            updates.put_nowait(("greeting", await orchestrator.start_conversation()))
+        return await scheduler.submit_streaming(request.message, lambda delta: updates.put_nowait(("delta", delta)))
+    
+    task = asyncio.ensure_future(process())
+    
+    async def watch_status():
+        version = orchestrator.state_version
+        while True:
+            if await orchestrator.wait_for_state_change(version, STATUS_STREAM_KEEPALIVE):
+                version = orchestrator.state_version
+                updates.put_nowait(("status", None))
+    
+    watcher = asyncio.ensure_future(watch_status())
+    
+    def finish(_):
+        watcher.cancel()
+        updates.put_nowait(None)
+    
+    task.add_done_callback(finish)
+    
+    async def events():
+        while (update := await updates.get()) is not None:
+            kind, text = update
+            if kind == "delta":
+                yield b"data: " + orjson.dumps({"delta": text}) + b"\n\n"
+            elif kind == "greeting":
+                yield b"event: greeting\ndata: " + orjson.dumps({"message": text}) + b"\n\n"
+            else:
+                body, _ = _status_snapshot(orchestrator)
+                yield b"event: status\ndata: " + body + b"\n\n"
+        
+        try:
+            response = task.result()
+        except Exception as e:
+            logger.error("API: Error processing message: %s", e, exc_info=True)
+            yield b"event: error\ndata: " + orjson.dumps({"detail": str(e)}) + b"\n\n"
+            return
+        logger.info("API: Message streamed, new stage: %s", orchestrator.current_workflow_stage)
+        yield b"event: done\ndata: " + orjson.dumps({"message": response, **_status_data(orchestrator)}) + b"\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/analyze", responses={200: {"model": MessageStatusResponse}})
+async def analyze_url(
+    request: AnalyzeRequest,
+    orchestrator: WorkflowOrchestrator = Depends(get_orchestrator),
+    scheduler: MessageScheduler = Depends(get_message_scheduler)
+):
+    """Run the full analysis pipeline for a product URL in one request
+    
+    Partial results can be followed on /api/status/stream while it runs.
+    """
+    if not request.url.startswith("http"):
+        logger.warning("API: Analyze called without a valid URL")
+        raise HTTPException(status_code=400, detail="A product URL starting with http:// or https:// is required")
+    
+    try:
+        logger.info("API: Starting full analysis for %s", request.url)
+        response = await scheduler.submit_analysis(request.url)
+        logger.info("API: Analysis finished in stage: %s", orchestrator.current_workflow_stage)
+        return ORJSONResponse({"message": response, **_status_data(orchestrator)})
+    except Exception as e:
+        logger.error("API: Error analyzing URL: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/status", responses={200: {"model": StatusResponse}})
+def get_status(request: Request, orchestrator: WorkflowOrchestrator = Depends(get_orchestrator)):
+    """Get the current status of the workflow
+
+    Declared as a plain def so FastAPI runs it in the threadpool and
+    building the response never stalls in-flight /api/message calls.
+    The serialized body is cached until the orchestrator state changes,
+    and clients sending a matching If-None-Match get a 304.
+    """
     try:
-        # Create a dictionary with relevant information from the orchestrator
-        status_data = {
-            "status": "active" if orchestrator.conversation_history else "idle",
-            "workflow_stage": orchestrator.current_workflow_stage,
-            "product_data": orchestrator.product_data if orchestrator.product_data else None,
-            "market_data": orchestrator.market_data if orchestrator.market_data else None,
-            "categories": orchestrator.category_data if orchestrator.category_data else None,
-            "audience_segments": orchestrator.final_results.get('audience_segments') if 'audience_segments' in orchestrator.final_results else None,
-            "strategies": orchestrator.final_results.get('marketing_strategies') if 'marketing_strategies' in orchestrator.final_results else None
-        }
-        return status_data
+        body, etag = _status_snapshot(orchestrator)
+        headers = {"ETag": etag}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
     except Exception as e:
-        logger.error(f"API: Error getting status: {str(e)}", exc_info=True)
+        logger.error("API: Error getting status: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/status/stream")
+async def stream_status(request: Request, orchestrator: WorkflowOrchestrator = Depends(get_orchestrator)):
+    """
+    Stream workflow status as Server-Sent Events.
+    
+    Sends the current snapshot on connect and a new one whenever the
+    orchestrator state changes, then an `end` event once the workflow
+    reaches the final summary.
+    """
+    async def events():
+        version = None
+        while not await request.is_disconnected():
+            if orchestrator.state_version == version:
+                if not await orchestrator.wait_for_state_change(version, STATUS_STREAM_KEEPALIVE):
+                    yield b": keep-alive\n\n"
+                continue
+            
+            version = orchestrator.state_version
+            body, _ = _status_snapshot(orchestrator)
+            yield b"data: " + body + b"\n\n"
+            
+            if orchestrator.current_workflow_stage == "final_summary":
+                yield b"event: end\ndata: {}\n\n"
+                return
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/api/reset")
-async def reset_workflow():
+async def reset_workflow(orchestrator: WorkflowOrchestrator = Depends(get_orchestrator)):
     """Reset the workflow"""
     try:
         logger.info("API: Resetting workflow")
@@ -118,13 +375,15 @@ async def reset_workflow():
         orchestrator.market_data = {}
         orchestrator.category_data = {}
         orchestrator.final_results = {}
+        orchestrator.mark_state_changed()
         logger.info("API: Workflow reset successfully")
         return {"status": "success", "message": "Workflow reset successfully"}
     except Exception as e:
-        logger.error(f"API: Error resetting workflow: {str(e)}", exc_info=True)
+        logger.error("API: Error resetting workflow: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
     logger.info("Starting Audience Andy API server")
     uvicorn.run(
@@ -132,5 +391,9 @@ if __name__ == "__main__":
         host="0.0.0.0", 
         port=int(os.environ.get("PORT", 8000)),
         reload=False,
-        log_level="info"
+        workers=int(os.environ.get("WORKERS", 1)),
+        log_level="info",
+        # uvloop is not available on Windows; fall back to the stdlib loop there
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools"
     ) 
\ No newline at end of file
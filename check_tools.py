@@ -1,5 +1,6 @@
 import os
 import sys
+import asyncio
 import traceback
 import logging
 from dotenv import load_dotenv
@@ -27,9 +28,9 @@ def check_environment_variables():
         value = os.getenv(key)
         if not value:
             missing_keys.append(key)
-            logger.error(f"Missing required environment variable: {key}")
+            logger.error("Missing required environment variable: %s", key)
         else:
-            logger.info(f"Found environment variable: {key} = {value[:4]}...")
+            logger.info("Found environment variable: %s = %s...", key, value[:4])
     
     if missing_keys:
         print("❌ Missing required environment variables:")
@@ -41,62 +42,34 @@ def check_environment_variables():
     print("✅ All required environment variables are set.")
     return True
 
-def check_tools_directly():
+async def check_tools_directly():
     """Check each tool class directly without going through the registry"""
     print("Directly checking individual tool classes...")
     
+    # Tool constructors do blocking I/O, so instantiate them concurrently in worker threads
+    tool_classes = [FirecrawlerTool, SerpAnalysisTool, CategoryTreeTool]
+    tools = await asyncio.gather(
+        *(asyncio.to_thread(tool_class) for tool_class in tool_classes),
+        return_exceptions=True
+    )
+    
     all_ok = True
     
-    # Check FirecrawlerTool
-    print("\nFirecrawlerTool:")
-    try:
-        tool = FirecrawlerTool()
-        if tool.is_available():
-            print(f"✅ FirecrawlerTool initialized successfully")
-            logger.info("FirecrawlerTool initialized successfully")
-        else:
-            print(f"❌ FirecrawlerTool failed: {tool.initialization_error}")
-            logger.error(f"FirecrawlerTool failed: {tool.initialization_error}")
+    for tool_class, tool in zip(tool_classes, tools):
+        tool_name = tool_class.__name__
+        print(f"\n{tool_name}:")
+        if isinstance(tool, Exception):
+            print(f"❌ {tool_name} instantiation error: {str(tool)}")
+            logger.error("%s instantiation error: %s", tool_name, tool)
+            logger.error("".join(traceback.format_exception(type(tool), tool, tool.__traceback__)))
             all_ok = False
-    except Exception as e:
-        print(f"❌ FirecrawlerTool instantiation error: {str(e)}")
-        logger.error(f"FirecrawlerTool instantiation error: {str(e)}")
-        logger.error(traceback.format_exc())
-        all_ok = False
-    
-    # Check SerpAnalysisTool
-    print("\nSerpAnalysisTool:")
-    try:
-        tool = SerpAnalysisTool()
-        if tool.is_available():
-            print(f"✅ SerpAnalysisTool initialized successfully")
-            logger.info("SerpAnalysisTool initialized successfully")
+        elif tool.is_available():
+            print(f"✅ {tool_name} initialized successfully")
+            logger.info("%s initialized successfully", tool_name)
         else:
-            print(f"❌ SerpAnalysisTool failed: {tool.initialization_error}")
-            logger.error(f"SerpAnalysisTool failed: {tool.initialization_error}")
+            print(f"❌ {tool_name} failed: {tool.initialization_error}")
+            logger.error("%s failed: %s", tool_name, tool.initialization_error)
             all_ok = False
-    except Exception as e:
-        print(f"❌ SerpAnalysisTool instantiation error: {str(e)}")
-        logger.error(f"SerpAnalysisTool instantiation error: {str(e)}")
-        logger.error(traceback.format_exc())
-        all_ok = False
-    
-    # Check CategoryTreeTool
-    print("\nCategoryTreeTool:")
-    try:
-        tool = CategoryTreeTool()
-        if tool.is_available():
-            print(f"✅ CategoryTreeTool initialized successfully")
-            logger.info("CategoryTreeTool initialized successfully")
-        else:
-            print(f"❌ CategoryTreeTool failed: {tool.initialization_error}")
-            logger.error(f"CategoryTreeTool failed: {tool.initialization_error}")
-            all_ok = False
-    except Exception as e:
-        print(f"❌ CategoryTreeTool instantiation error: {str(e)}")
-        logger.error(f"CategoryTreeTool instantiation error: {str(e)}")
-        logger.error(traceback.format_exc())
-        all_ok = False
     
     return all_ok
 
@@ -113,10 +86,10 @@ def check_tools_registry():
         for tool_name, status_msg in status.items():
             if status_msg == "initialized":
                 print(f"✅ {tool_name}: Initialized successfully")
-                logger.info(f"Tool {tool_name} initialized successfully")
+                logger.info("Tool %s initialized successfully", tool_name)
             else:
                 print(f"❌ {tool_name}: {status_msg}")
-                logger.error(f"Tool {tool_name} failed to initialize: {status_msg}")
+                logger.error("Tool %s failed to initialize: %s", tool_name, status_msg)
                 all_ok = False
         
         if not all_ok:
@@ -146,7 +119,7 @@ def main():
     print("\n")
     
     # Then check tools directly
-    tools_direct_ok = check_tools_directly()
+    tools_direct_ok = asyncio.run(check_tools_directly())
     print("\n")
     
     # Then check through registry
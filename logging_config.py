@@ -0,0 +1,61 @@
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_FILE = "api.log"
+
+# Set by configure_once so repeated imports (e.g. run_server.py followed by
+# uvicorn importing api.py) don't stack a second set of handlers on the root logger
+_configured = False
+_log_listener = None
+
+def configure_once(level: int = logging.INFO) -> None:
+    """
+    Configure the root logger for this process, once.
+    
+    Records are put on a queue by the root handler and written to the console
+    and LOG_FILE by a background listener thread, so callers never block on I/O.
+    Any handlers installed before this call (e.g. by an implicit basicConfig
+    from a module-level logging.info) are replaced.
+    """
+    global _configured, _log_listener
+    if _configured:
+        return
+    _configured = True
+    
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [
+        logging.StreamHandler(),  # Log to console
+        logging.FileHandler(LOG_FILE)  # Also log to a file
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.SimpleQueue()
+    _log_listener = QueueListener(log_queue, *handlers)
+    _log_listener.start()
+    atexit.register(shutdown)
+    
+    logging.basicConfig(
+        level=level,
+        format='%(message)s',
+        handlers=[QueueHandler(log_queue)],
+        force=True
+    )
+
+def shutdown() -> None:
+    """
+    Flush queued log records and stop the listener thread.
+    
+    Records logged after this would sit on a queue nobody reads, so the next
+    configure_once call sets everything up again with a new listener.
+    """
+    global _configured, _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        for handler in _log_listener.handlers:
+            handler.close()
+        _log_listener = None
+    _configured = False
@@ -4,35 +4,42 @@ import os
 import time
 import signal
 import atexit
+import requests
+from requests.adapters import HTTPAdapter
 
 from check_tools import main as check_system
 
 def run_backend():
     print("Starting FastAPI backend...")
+    # Output is inherited from this process, so logs go straight to the terminal
     backend_process = subprocess.Popen(
-        ["uvicorn", "api:app", "--host", "0.0.0.0", "--port", "8000"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        universal_newlines=True
+        ["uvicorn", "api:app", "--host", "0.0.0.0", "--port", "8000"]
     )
     return backend_process
 
 def run_frontend():
     print("Starting Streamlit frontend...")
     frontend_process = subprocess.Popen(
-        ["streamlit", "run", "streamlit_app.py", "--server.port", "8501"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        universal_newlines=True
+        ["streamlit", "run", "streamlit_app.py", "--server.port", "8501"]
     )
     return frontend_process
 
-def print_log(process, name):
-    """Print log from process"""
-    output_line = process.stdout.readline()
-    if output_line:
-        print(f"[{name}] {output_line.rstrip()}")
-    return process.poll() is None  # Return True if process is still running
+def wait_for_backend(process, url="http://127.0.0.1:8000/healthz", timeout=10.0, interval=0.1):
+    """Poll the backend health endpoint until it responds, the process exits or the timeout expires"""
+    deadline = time.monotonic() + timeout
+    # Reuse one keep-alive connection across polls instead of reconnecting every time
+    with requests.Session() as session:
+        session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                return False
+            try:
+                if session.get(url, timeout=0.2).status_code == 200:
+                    return True
+            except requests.exceptions.RequestException:
+                pass
+            time.sleep(interval)
+    return False
 
 def kill_processes(processes):
     """Kill all processes in the list"""
@@ -62,8 +69,12 @@ def main():
         backend_process = run_backend()
         processes.append(backend_process)
         
-        # Give the backend a moment to start
-        time.sleep(2)
+        # Wait for the backend to be ready before starting the frontend
+        if not wait_for_backend(backend_process):
+            if backend_process.poll() is not None:
+                print("Backend exited during startup.")
+                return 1
+            print("Backend is not responding yet, starting frontend anyway...")
         
         frontend_process = run_frontend()
         processes.append(frontend_process)
@@ -80,13 +91,9 @@ def main():
         print("Streamlit frontend: http://localhost:8501")
         print("\nPress Ctrl+C to stop both services.\n")
         
-        # Monitor output from both processes
-        while True:
-            backend_running = print_log(backend_process, "Backend")
-            frontend_running = print_log(frontend_process, "Frontend")
-            
-            if not backend_running or not frontend_running:
-                break
+        # Wait until either process exits
+        while all(process.poll() is None for process in processes):
+            time.sleep(0.5)
                 
     except KeyboardInterrupt:
         print("\nShutting down services...")
@@ -1,20 +1,16 @@
 import uvicorn
 import logging
 import os
+import sys
 from dotenv import load_dotenv
 
+import logging_config
+
 # Load environment variables
 load_dotenv()
 
-# Setup logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("app.log")
-    ]
-)
+# Setup logging configuration (shared with api.py, which is imported by uvicorn below)
+logging_config.configure_once()
 
 if __name__ == "__main__":
     # Set logging to INFO for both our app and uvicorn
@@ -30,6 +26,10 @@ if __name__ == "__main__":
         host="0.0.0.0", 
         port=int(os.environ.get("PORT", 8000)),
         reload=False,
+        workers=int(os.environ.get("WORKERS", 1)),
         log_level="info",
-        access_log=True
+        access_log=True,
+        # uvloop is not available on Windows; fall back to the stdlib loop there
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools"
     ) 
\ No newline at end of file
@@ -1,22 +1,124 @@
 import streamlit as st
-import requests
-import json
+from streamlit.errors import StreamlitAPIException
+import httpx
+import orjson
+import diskcache
 import os
+import re
+import logging
 import time
-from typing import List, Dict, Any
-import pandas as pd
+import queue
+import hashlib
+import threading
+import uuid
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, Final, Optional, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # API URL configuration - allow for local dev or production deployed API
 API_URL = os.getenv("API_URL", "http://localhost:8000")
 
-# Define CSS functions
-def create_loading_animation_css():
-    """Add CSS for a better loading animation"""
-    return """
+def _loads(data) -> Any:
+    """Parse a JSON API payload with orjson, which is much faster than json on the large status dicts"""
+    return orjson.loads(data)
+
+_JSON_HEADERS: Final[Dict[str, str]] = {"Content-Type": "application/json"}
+
+def _dumps(payload: Any) -> bytes:
+    """Serialize a JSON request body with orjson"""
+    return orjson.dumps(payload)
+
+@st.cache_resource
+def _http() -> httpx.Client:
+    """Shared HTTP client for the backend API, pooled across reruns and sessions"""
+    return httpx.Client(
+        base_url=API_URL,
+        timeout=httpx.Timeout(connect=2, read=60, write=10, pool=5),
+        limits=httpx.Limits(max_keepalive_connections=4, max_connections=8),
+        transport=httpx.HTTPTransport(retries=1)
+    )
+
+# Seconds a mirrored status snapshot is kept on disk
+STATUS_CACHE_TTL = 3600
+
+@st.cache_resource
+def _disk() -> diskcache.Cache:
+    """Local mirror of each session's last status snapshot, so a page reload can restore the workflow"""
+    return diskcache.Cache(".cache/status", size_limit=100_000_000)
+
+def _snapshot_key():
+    """
+    Disk key for this browser session's status snapshot.
+    
+    Streamlit assigns a new session id on every reload, so the session is
+    identified by an id kept in the page URL instead, which a reload keeps.
+    """
+    sid = st.query_params.get("sid")
+    if not sid:
+        sid = uuid.uuid4().hex
+        st.query_params["sid"] = sid
+    return (API_URL, sid)
+
+# Matches a product URL in a chat message
+_URL_RE = re.compile(r"https?://\S+")
+
+# Keywords that pick the thinking animation for a chat message
+_SIMPLE_RE = re.compile(r"quick|fast|simple", re.IGNORECASE)
+_DETAILED_RE = re.compile(r"analyze|research|explore|investigate", re.IGNORECASE)
+
+# Whether debug tools are available in the UI
+_DEBUG = os.getenv("STREAMLIT_DEBUG") == "1"
+
+# Most chat messages kept in a session; older ones are dropped
+MAX_HISTORY = 500
+
+# Number of chat messages rendered at a time
+CHAT_WINDOW = 40
+
+# Seconds to wait before reconnecting a dropped status stream, doubled on each
+# failed attempt until it passes the maximum, at which point the listener gives up
+STATUS_STREAM_RETRY_DELAY = 0.5
+STATUS_STREAM_MAX_RETRY_DELAY = 8.0
+
+# Longest a status stream listener runs, so one left behind by an abandoned
+# session can't hold a backend connection forever
+STATUS_STREAM_MAX_AGE = 900.0
+
+# Seconds between checks for status updates queued by the stream listener
+STATUS_WATCH_INTERVAL = 2.0
+
+# Minimum seconds between attempts to start a conversation
+START_RETRY_INTERVAL = 5.0
+
+# Logo bundled next to this script, overridable with the LOGO_PATH env var
+LOGO_PATH = os.getenv("LOGO_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "Group.png")
+
+# Inline stand-in for the logo, shown if the image file is missing
+_LOGO_PLACEHOLDER = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="150" height="150">'
+    '<rect width="150" height="150" rx="12" fill="#1E88E5"/>'
+    '<text x="75" y="82" font-family="sans-serif" font-size="18" fill="white" text-anchor="middle">Audience Andy</text>'
+    '</svg>'
+)
+
+@st.cache_resource
+def _logo() -> bytes:
+    """Read the logo once per server process rather than from disk on every rerun"""
+    try:
+        with open(LOGO_PATH, "rb") as f:
+            return f.read()
+    except OSError:
+        return b""
+
+# Page styles: loading animation, thinking animation and the rest of the UI.
+# A single literal, since nothing in it is dynamic
+_CSS: Final[str] = """
     <style>
         /* Improve visibility of the spinner */
         .stSpinner > div {
@@ -44,14 +146,6 @@ def create_loading_animation_css():
             border-radius: 2px;
         }
         
-        /* Add CSS for the rest of your loading elements */
-        """ + create_thinking_animation_css() + create_ui_style_css() + """
-    </style>
-    """
-
-def create_thinking_animation_css():
-    """Create CSS specifically for the thinking animation"""
-    return """
         /* Animated thinking dots */
         @keyframes thinking-dots {
             0% { content: "."; }
@@ -81,11 +175,7 @@ def create_thinking_animation_css():
             margin-left: 4px;
             font-weight: bold;
         }
-    """
-
-def create_ui_style_css():
-    """Create CSS for UI elements like chat container, sidebar, etc."""
-    return """
+    
         /* Progress bar styling */
         .stProgress > div > div {
             background-color: #1E88E5 !important;
@@ -184,20 +274,6 @@ def create_ui_style_css():
             overflow-y: auto !important;
         }
         
-        /* Force user messages to right side */
-        [data-testid="stChatInput"] {
-            width: 100% !important;
-            border: none !important;
-            background: transparent !important;
-        }
-        
-        /* Force chat input to fill the container */
-        [data-testid="stChatInput"] > div {
-            width: 100% !important;
-            padding: 0 !important;
-            background: transparent !important;
-        }
-
         /* The trick to align messages correctly */
         [data-testid="stChatMessageContainer"] {
             width: 100% !important;
@@ -328,6 +404,7 @@ def create_ui_style_css():
             border-color: #334155 !important;
             margin: 20px 0 !important;
         }
+    </style>
     """
 
 # Page configuration
@@ -339,86 +416,110 @@ st.set_page_config(
 )
 
 # Add custom CSS
-st.markdown(create_loading_animation_css(), unsafe_allow_html=True)
+st.markdown(_CSS, unsafe_allow_html=True)
 
 # Initialize session state
-if "messages" not in st.session_state:
-    st.session_state.messages = []
+# Chat history as parallel deques of roles and contents, capped at MAX_HISTORY
+# messages; message_total counts every message ever added, evicted or not
+if "roles" not in st.session_state:
+    st.session_state.roles = deque(maxlen=MAX_HISTORY)
+    st.session_state.contents = deque(maxlen=MAX_HISTORY)
+    st.session_state.message_total = 0
 
-if "workflow_stage" not in st.session_state:
-    st.session_state.workflow_stage = "initial"
-    
-if "is_analyzing" not in st.session_state:
-    st.session_state.is_analyzing = False
+# Workflow state a new session starts with, and a reset returns to
+_WORKFLOW_DEFAULTS: Final[Dict[str, Any]] = {
+    "workflow_stage": "initial",
+    "is_analyzing": False,
+    "thinking_animation_type": "auto",
+    "product_data": None,
+    "market_data": None,
+    "categories": None,
+    "audience_segments": None,
+    "strategies": None
+}
 
-if "thinking_animation_type" not in st.session_state:
-    st.session_state.thinking_animation_type = "auto"
+for key, value in _WORKFLOW_DEFAULTS.items():
+    st.session_state.setdefault(key, value)
 
-if "product_data" not in st.session_state:
-    st.session_state.product_data = None
-    
-if "market_data" not in st.session_state:
-    st.session_state.market_data = None
-    
-if "categories" not in st.session_state:
-    st.session_state.categories = None
-    
-if "audience_segments" not in st.session_state:
-    st.session_state.audience_segments = None
-    
-if "strategies" not in st.session_state:
-    st.session_state.strategies = None
+# Workflow stages in the order the analysis goes through them, with their display labels
+_STAGE_ITEMS = (
+    ("initial", "Initial"),
+    ("url_analysis", "Product Analysis"),
+    ("market_research", "Market Research"),
+    ("category_mapping", "Category Mapping"),
+    ("audience_segmentation", "Audience Segmentation"),
+    ("marketing_strategy", "Marketing Strategy"),
+    ("final_summary", "Final Summary")
+)
 
-if "expanded_categories" not in st.session_state:
-    st.session_state.expanded_categories = {}
-    
-if "expanded_segments" not in st.session_state:
-    st.session_state.expanded_segments = {}
+_STAGE_ORDER = tuple(stage for stage, _ in _STAGE_ITEMS)
 
-# Helper functions to handle dropdown clicks
-def toggle_category(category_id):
-    st.session_state.expanded_categories[category_id] = not st.session_state.expanded_categories.get(category_id, False)
+# Position of each stage in the workflow
+_STAGE_INDEX = {stage: i for i, stage in enumerate(_STAGE_ORDER)}
 
-def toggle_segment(segment_id):
-    st.session_state.expanded_segments[segment_id] = not st.session_state.expanded_segments.get(segment_id, False)
+# Display label for each stage
+_STAGE_LABELS = dict(_STAGE_ITEMS)
+
+# Estimated time for each workflow stage in seconds
+STAGE_TIMES: Final[Dict[str, int]] = {
+    "initial": 5,
+    "url_analysis": 20,
+    "market_research": 25,
+    "category_mapping": 40,
+    "audience_segmentation": 20,
+    "marketing_strategy": 30,
+    "final_summary": 15
+}
+
+# Loading message shown while each stage is running
+_STAGE_LOADING = {
+    "initial": "🔍 Analyzing product URL and extracting data",
+    "url_analysis": "🔍 Analyzing product URL and extracting data",
+    "market_research": "📊 Researching market data and identifying competitors",
+    "category_mapping": "🗂️ Mapping product to marketing categories and exploring subcategories",
+    "audience_segmentation": "👥 Generating detailed audience segments based on product analysis",
+    "marketing_strategy": "📈 Developing marketing strategy recommendations",
+    "final_summary": "📑 Creating comprehensive analysis summary"
+}
+
+# Loading message markup, with and without a stage-specific message
+_LOADING_HTML = '<div class="loading-message">{message}... (Est. time: {seconds} seconds)</div>'.format
+_PROCESSING_HTML = '<div class="loading-message">⏳ Processing your request...</div>'
 
 def get_stage_estimated_time(stage):
     """Return the estimated time for each workflow stage in seconds"""
-    stage_times = {
-        "initial": 5,
-        "url_analysis": 20,
-        "market_research": 25,
-        "category_mapping": 40,
-        "audience_segmentation": 20,
-        "marketing_strategy": 30,
-        "final_summary": 15
-    }
-    return stage_times.get(stage, 15)  # Default 15 seconds for unknown stages
+    return STAGE_TIMES.get(stage, 15)  # Default 15 seconds for unknown stages
+
+# Estimated time of a full analysis, from product analysis to the final summary
+TOTAL_ANALYSIS_TIME: Final[int] = sum(STAGE_TIMES[stage] for stage in _STAGE_ORDER[1:])
+
+# Fraction of the analysis that is complete once each workflow stage is reached,
+# from the estimated times of the stages before it
+_STAGE_PROGRESS = {
+    stage: sum(STAGE_TIMES[done] for done in _STAGE_ORDER[1:i]) / TOTAL_ANALYSIS_TIME
+    for i, stage in enumerate(_STAGE_ORDER)
+    if i > 0
+}
+
+def _progress_for_stage(stage):
+    """Return the progress bar value for a workflow stage"""
+    return _STAGE_PROGRESS.get(stage, 0.0)
 
 def display_thinking_animation():
     """Display a thinking animation with stage-specific loading messages"""
     # Show the basic thinking animation bubble
-    st.markdown('<div class="thinking-animation">Thinking</div>', unsafe_allow_html=True)
+    st.html('<div class="thinking-animation">Thinking</div>')
     
     # Show more detailed message about what's happening based on the current stage
     current_stage = st.session_state.workflow_stage
     est_time = get_stage_estimated_time(current_stage)
     
     with st.chat_message("assistant"):
-        if current_stage == "initial" or current_stage == "url_analysis":
-            st.markdown(f'<div class="loading-message">🔍 Analyzing product URL and extracting data... (Est. time: {est_time} seconds)</div>', unsafe_allow_html=True)
-        elif current_stage == "market_research":
-            st.markdown(f'<div class="loading-message">📊 Researching market data and identifying competitors... (Est. time: {est_time} seconds)</div>', unsafe_allow_html=True)
-        elif current_stage == "category_mapping":
-            st.markdown(f'<div class="loading-message">🗂️ Mapping product to marketing categories and exploring subcategories... (Est. time: {est_time} seconds)</div>', unsafe_allow_html=True)
-        elif current_stage == "audience_segmentation":
-            st.markdown(f'<div class="loading-message">👥 Generating detailed audience segments based on product analysis... (Est. time: {est_time} seconds)</div>', unsafe_allow_html=True)
-        elif current_stage == "marketing_strategy":
-            st.markdown(f'<div class="loading-message">📈 Developing marketing strategy recommendations... (Est. time: {est_time} seconds)</div>', unsafe_allow_html=True)
-        elif current_stage == "final_summary":
-            st.markdown(f'<div class="loading-message">📑 Creating comprehensive analysis summary... (Est. time: {est_time} seconds)</div>', unsafe_allow_html=True)
+        loading_message = _STAGE_LOADING.get(current_stage)
+        if loading_message:
+            st.html(_LOADING_HTML(message=loading_message, seconds=est_time))
         else:
-            st.markdown('<div class="loading-message">⏳ Processing your request...</div>', unsafe_allow_html=True)
+            st.html(_PROCESSING_HTML)
         
         # Add a spinner to indicate ongoing processing
         with st.spinner(""):
@@ -427,65 +528,203 @@ def display_thinking_animation():
 
 def display_simple_thinking_animation():
     """Display just the thinking animation bubble without additional messages"""
-    st.markdown('<div class="thinking-animation">Thinking</div>', unsafe_allow_html=True)
+    st.html('<div class="thinking-animation">Thinking</div>')
+
+@st.cache_data(ttl=1, show_spinner=False)
+def _fetch_status(etag: Optional[str]) -> Tuple[int, Optional[str], bytes]:
+    """
+    GET /api/status and return (status code, ETag, body).
+    
+    Cached for a second so identical requests from parts of the page (or
+    sessions) running at the same moment share a single HTTP call.
+    """
+    headers = {"If-None-Match": etag} if etag else {}
+    response = _http().get("/api/status", headers=headers, timeout=5)
+    return response.status_code, response.headers.get("etag"), response.content
 
 def get_api_status():
-    """Get the current status of the API workflow"""
+    """Get the current status of the API workflow
+    
+    Sends the ETag of the last response so an unchanged status comes back as
+    a bodyless 304, in which case the previously parsed payload is returned.
+    """
     try:
-        response = requests.get(f"{API_URL}/api/status", timeout=5)
-        if response.status_code == 200:
-            return response.json()
+        status_code, etag, content = _fetch_status(st.session_state.get("last_etag"))
+        if status_code == 304:
+            return st.session_state.get("last_status_data")
+        if status_code == 200:
+            status_data = _loads(content)
+            st.session_state.last_etag = etag
+            st.session_state.last_status_data = status_data
+            return status_data
         else:
             # Don't show error message on every retry
-            if response.status_code == 500:
+            if status_code == 500:
                 return None
-            st.error(f"Error getting API status: {response.text}")
+            st.error(f"Error getting API status: {content.decode(errors='replace')}")
             return None
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         # Silently handle timeout errors without showing the user
         return None
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         # Silently handle connection errors without showing the user
         return None
     except Exception as e:
         st.error(f"Error connecting to API: {str(e)}")
         return None
 
-def update_session_state_from_api():
-    """Update the session state based on the API status"""
-    # Limit how often we check API status
-    current_time = time.time()
-    last_check = getattr(st.session_state, 'last_api_check', 0)
+def _sse_listener(events, stop):
+    """Read the /api/status/stream Server-Sent Events and queue each changed status payload
     
-    # Only check once every 2 seconds to avoid spamming
-    if current_time - last_check < 2:
+    Runs in a background thread, so it only hands payloads to the script
+    thread through `events` and never touches Streamlit APIs itself. Exits
+    when `stop` is set or after STATUS_STREAM_MAX_AGE seconds. It opens its
+    own connection rather than taking one from the shared _http() pool.
+    """
+    deadline = time.monotonic() + STATUS_STREAM_MAX_AGE
+    last_hash = None
+    delay = STATUS_STREAM_RETRY_DELAY
+    # The server sends a keep-alive comment every 15 seconds, so a long read
+    # timeout is safe and the stop checks below run at least that often
+    with httpx.Client(base_url=API_URL, timeout=httpx.Timeout(connect=2, read=60, write=10, pool=5)) as client:
+        while not stop.is_set():
+            try:
+                with client.stream("GET", "/api/status/stream") as response:
+                    response.raise_for_status()
+                    for line in response.iter_lines():
+                        if stop.is_set():
+                            return
+                        if time.monotonic() > deadline:
+                            logger.info("Status stream closed after %.0f seconds", STATUS_STREAM_MAX_AGE)
+                            return
+                        if line.startswith("event: end"):
+                            return
+                        if not line.startswith("data: "):
+                            continue
+                        
+                        # Connected and receiving again, so start the backoff over next time
+                        delay = STATUS_STREAM_RETRY_DELAY
+                        payload = line[6:]
+                        payload_hash = hashlib.blake2b(payload.encode(), digest_size=8).digest()
+                        if payload_hash == last_hash:
+                            continue
+                        last_hash = payload_hash
+                        events.put(_loads(payload))
+                return
+            except Exception as e:
+                if delay > STATUS_STREAM_MAX_RETRY_DELAY:
+                    logger.warning("Status stream closed: %s", e)
+                    return
+                # Reconnect with exponential backoff so a brief outage doesn't
+                # lose the stream, unless the listener is stopped meanwhile
+                if stop.wait(delay):
+                    return
+                delay *= 2
+
+def start_status_stream():
+    """Start the status stream listener for this session unless one is already running"""
+    thread = st.session_state.get("status_stream_thread")
+    stop = st.session_state.get("status_stream_stop")
+    if thread is not None and thread.is_alive() and not stop.is_set():
+        return
+    
+    if "status_events" not in st.session_state:
+        st.session_state.status_events = queue.Queue()
+    stop = threading.Event()
+    thread = threading.Thread(target=_sse_listener, args=(st.session_state.status_events, stop), daemon=True)
+    thread.start()
+    st.session_state.status_stream_thread = thread
+    st.session_state.status_stream_stop = stop
+
+def stop_status_stream():
+    """Tell this session's status stream listener, if any, to exit"""
+    stop = st.session_state.get("status_stream_stop")
+    if stop is not None:
+        stop.set()
+
+def drain_status_events():
+    """Apply the newest status payload received from the stream, if any
+    
+    Returns:
+        True if it changed the session state, False otherwise
+    """
+    events = st.session_state.get("status_events")
+    status_data = None
+    if events is not None:
+        while True:
+            try:
+                status_data = events.get_nowait()
+            except queue.Empty:
+                break
+    
+    return bool(status_data) and apply_status(status_data)
+
+def status_stream_running():
+    """Check whether this session's status stream listener is still running"""
+    thread = st.session_state.get("status_stream_thread")
+    return thread is not None and thread.is_alive() and not st.session_state.status_stream_stop.is_set()
+
+@st.fragment(run_every=STATUS_WATCH_INTERVAL)
+def status_watcher():
+    """
+    Apply status updates queued by the stream listener while it runs.
+    
+    The listener thread can't rerun the script itself, so this fragment
+    checks its queue every few seconds and reruns the whole app when an
+    update changed the workflow, so the sidebar shows it.
+    """
+    if drain_status_events():
+        st.rerun()
+
+def restore_status():
+    """Restore the workflow status in a new session (e.g. after a page reload)
+    
+    The backend's status always wins when it can be reached, even if it is
+    idle; the snapshot mirrored on disk is only used when it can't.
+    """
+    status_data = get_api_status()
+    if status_data is None:
+        status_data = _disk().get(_snapshot_key())
+    if status_data:
+        apply_status(status_data)
+
+def update_session_state_from_api():
+    """Update the session state from the status stream, falling back to a one-off /api/status request"""
+    drain_status_events()
+    if status_stream_running():
         return
-        
-    st.session_state.last_api_check = current_time
     
     status_data = get_api_status()
     if status_data:
-        st.session_state.workflow_stage = status_data.get("workflow_stage", "initial")
-        
-        # Update product data if available
-        if status_data.get("product_data"):
-            st.session_state.product_data = status_data["product_data"]
-            
-        # Update market data if available
-        if status_data.get("market_data"):
-            st.session_state.market_data = status_data["market_data"]
-            
-        # Update categories if available
-        if status_data.get("categories"):
-            st.session_state.categories = status_data["categories"]
-            
-        # Update audience segments if available
-        if status_data.get("audience_segments"):
-            st.session_state.audience_segments = status_data["audience_segments"]
-            
-        # Update strategies if available
-        if status_data.get("strategies"):
-            st.session_state.strategies = status_data["strategies"]
+        apply_status(status_data)
+
+def apply_status(status_data):
+    """Copy a status payload from the API into the session state
+    
+    Returns:
+        True if the payload differed from the last one applied, False otherwise
+    """
+    # Leave the session state untouched when nothing changed since the last payload
+    status_hash = hashlib.blake2b(orjson.dumps(status_data, option=orjson.OPT_SORT_KEYS, default=str), digest_size=8).digest()
+    if st.session_state.get("_last_status_hash") == status_hash:
+        return False
+    st.session_state._last_status_hash = status_hash
+    st.session_state.pop("_sidebar_md", None)
+    
+    stage = status_data.get("workflow_stage", "initial")
+    # The snapshot only needs rewriting when the workflow reaches a new stage
+    if stage != st.session_state.workflow_stage:
+        _disk().set(_snapshot_key(), status_data, expire=STATUS_CACHE_TTL)
+    st.session_state.workflow_stage = stage
+    
+    # Every payload carries the full status, so a missing field means the
+    # backend no longer has it (e.g. after a reset) and it is cleared here too
+    st.session_state.product_data = status_data.get("product_data")
+    st.session_state.market_data = status_data.get("market_data")
+    st.session_state.categories = status_data.get("categories")
+    st.session_state.audience_segments = status_data.get("audience_segments")
+    st.session_state.strategies = status_data.get("strategies")
+    return True
 
 def start_conversation():
     """Start a new conversation with the assistant"""
@@ -494,22 +733,18 @@ def start_conversation():
     loading_msg = st.empty()
     loading_msg.info("Starting conversation...")
     
-    # Prevent repeated calls in a short time period
-    current_time = time.time()
-    last_start_attempt = getattr(st.session_state, 'last_start_attempt', 0)
+    # Prevent repeated calls in a short time period (monotonic, so clock changes can't stall it)
+    current_time = time.monotonic()
+    last_start_attempt = st.session_state.get("last_start_attempt", float("-inf"))
     
-    # Only attempt to start once every 5 seconds
-    if current_time - last_start_attempt < 5:
+    # Only attempt to start once every START_RETRY_INTERVAL seconds
+    if current_time - last_start_attempt < START_RETRY_INTERVAL:
         loading_msg.warning("Please wait a moment before trying again.")
         return False
         
     st.session_state.last_start_attempt = current_time
     
     try:
-        # Make sure messages list exists
-        if "messages" not in st.session_state:
-            st.session_state.messages = []
-            
         # Show the actual URL being called for debugging
         api_url = f"{API_URL}/api/start"
         st.session_state.debug_info = f"Calling: {api_url}"
@@ -517,7 +752,7 @@ def start_conversation():
         # Log the request details
         loading_msg.info(f"Sending request to {api_url}...")
         
-        response = requests.post(api_url, timeout=10)  # Increased timeout
+        response = _http().post(api_url, timeout=10)  # Increased timeout
         
         # Log the raw response for debugging
         st.session_state.raw_response = {
@@ -529,7 +764,7 @@ def start_conversation():
         
         if response.status_code == 200:
             try:
-                data = response.json()
+                data = _loads(response.content)
                 # Clear any previous error flags
                 st.session_state.connection_error_shown = False
                 st.session_state.timeout_error_shown = False
@@ -544,15 +779,17 @@ def start_conversation():
                     return False
                 
                 # Add the message to the chat history
-                st.session_state.messages.append({"role": "assistant", "content": message})
+                add_message("assistant", message)
                 
                 # Verify message was added
-                st.session_state.message_count = len(st.session_state.messages)
+                st.session_state.message_count = len(st.session_state.contents)
                 
+                # Subscribe to workflow updates pushed by the backend
+                start_status_stream()
                 update_session_state_from_api()
                 loading_msg.success("Conversation started successfully!")
                 return True
-            except json.JSONDecodeError as e:
+            except orjson.JSONDecodeError as e:
                 loading_msg.error(f"Invalid JSON response: {str(e)}")
                 st.session_state.json_error = str(e)
                 return False
@@ -565,11 +802,11 @@ def start_conversation():
             # Show the actual error for better debugging
             loading_msg.error(f"Error starting conversation: {response.status_code} - {response.text}")
             return False
-    except requests.exceptions.ConnectionError as e:
+    except httpx.ConnectError as e:
         loading_msg.error(f"Cannot connect to the server at {API_URL}. Please check if the backend is running. Error: {str(e)}")
         st.session_state.connection_error_shown = True
         return False
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         loading_msg.error(f"Request to {API_URL} timed out. The server might be starting up or under heavy load.")
         st.session_state.timeout_error_shown = True
         return False
@@ -578,7 +815,68 @@ def start_conversation():
         st.session_state.last_error = str(e)
         return False
 
-def send_message(message, thinking_animation_type="auto"):
+def start_and_send(message):
+    """Start a conversation and send its first message in a single request
+    
+    The greeting and the reply are streamed like any other message, with the
+    same progress bar for a URL analysis.
+    
+    Returns:
+        True if the conversation was started, False otherwise
+    """
+    if not message.strip():
+        return False
+    
+    animation_type = "detailed" if _URL_RE.search(message) else "auto"
+    send_message(message, thinking_animation_type=animation_type, chat_log=st.container(), start=True)
+    # The greeting is only added once the backend has started the conversation
+    return bool(st.session_state.contents)
+
+def _stream_message(message: str, result: dict, on_status=None, on_greeting=None):
+    """
+    Yield reply text from /api/message/stream as it is generated.
+    
+    Status updates sent while the message is processed are passed to
+    `on_status`. The final reply and workflow status from the closing `done`
+    event are stored in `result`. When `on_greeting` is given, the backend
+    starts the conversation first and the greeting is passed to it before
+    any reply text.
+    """
+    payload = {"message": message}
+    if on_greeting is not None:
+        payload["start"] = True
+    with _http().stream(
+        "POST",
+        "/api/message/stream",
+        content=_dumps(payload),
+        headers=_JSON_HEADERS,
+        # The whole analysis can run for minutes, so don't time out waiting for the reply
+        timeout=httpx.Timeout(connect=2, read=None, write=10, pool=5)
+    ) as response:
+        if response.is_error:
+            response.read()
+            response.raise_for_status()
+        
+        event = "message"
+        for line in response.iter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                payload = _loads(line[len("data: "):])
+                if event == "done":
+                    result.update(payload)
+                elif event == "error":
+                    raise RuntimeError(payload["detail"])
+                elif event == "status":
+                    if on_status is not None:
+                        on_status(payload)
+                elif event == "greeting":
+                    on_greeting(payload["message"])
+                else:
+                    yield payload["delta"]
+                event = "message"
+
+def send_message(message, thinking_animation_type="auto", chat_log=None, start=False):
     """Send a message to the API and receive a response
     
     Args:
@@ -588,12 +886,30 @@ def send_message(message, thinking_animation_type="auto"):
             - "simple": Only show the basic thinking bubble
             - "detailed": Show the thinking bubble with detailed stage info
             - "none": Don't show any thinking animation
+        chat_log: Container returned by display_chat; when given, the user
+            message and the streamed reply are shown in it right away instead
+            of after the next rerun
+        start: Start the conversation in the same request; the greeting is
+            added ahead of the user message once the backend sends it
     """
     if not message.strip():
         return
     
+    user_shown = False
+    
+    def show_user_message(container):
+        nonlocal user_shown
+        add_message("user", message)
+        if container is not None:
+            render_new_messages(container)
+        user_shown = True
+    
     # Add user message to chat
-    st.session_state.messages.append({"role": "user", "content": message})
+    if not start:
+        show_user_message(chat_log)
+    
+    # Make sure workflow updates are being pushed (the stream ends after each final summary)
+    start_status_stream()
     
     # Show a loading indicator in the UI based on the specified animation type
     if thinking_animation_type != "none":
@@ -604,140 +920,99 @@ def send_message(message, thinking_animation_type="auto"):
     
     try:
         # Add a progress indicator at the top of the page for URL analysis 
-        if "http" in message and st.session_state.workflow_stage == "initial":
+        progress_bar = None
+        if _URL_RE.search(message) and st.session_state.workflow_stage == "initial":
             progress_placeholder = st.empty()
             progress_bar = progress_placeholder.progress(0)
             status_placeholder = st.empty()
-            status_placeholder.write("Starting comprehensive product analysis. This typically takes 1-2 minutes.")
-            
-            # Total estimated time for all workflow stages
-            total_time = sum(get_stage_estimated_time(stage) for stage in ["url_analysis", "market_research", "category_mapping", "audience_segmentation", "marketing_strategy", "final_summary"])
-            
-            start_time = time.time()
-            
-            # Simulate progress for long-running requests
-            def update_progress():
-                # Create realistic progress based on estimated times for each stage
-                stages = [
-                    ("url_analysis", 0.15),
-                    ("market_research", 0.25), 
-                    ("category_mapping", 0.40),
-                    ("audience_segmentation", 0.60),
-                    ("marketing_strategy", 0.85),
-                    ("final_summary", 1.0)
-                ]
-                
-                current_progress = 0.0
-                last_update = time.time()
-                is_analyzing = True
-                
-                try:
-                    while current_progress < 0.99 and is_analyzing:
-                        # Check if session_state still exists and has the attribute
-                        try:
-                            is_analyzing = st.session_state.get("is_analyzing", False)
-                        except:
-                            # If we can't access session_state, assume we should stop
-                            is_analyzing = False
-                            break
-                            
-                        current_time = time.time()
-                        elapsed = current_time - start_time
-                        
-                        # Don't update too frequently to avoid flickering
-                        if current_time - last_update < 1.0:
-                            time.sleep(0.5)
-                            continue
-                        
-                        # Calculate progress based on elapsed time
-                        current_progress = min(0.99, elapsed / total_time)
-                        
-                        try:
-                            progress_bar.progress(current_progress)
-                            
-                            # Update the status message with estimated time remaining
-                            remaining = max(0, total_time - elapsed)
-                            status_placeholder.write(f"Analyzing product... (Approximately {int(remaining)} seconds remaining)")
-                        except:
-                            # If UI elements are no longer accessible, exit the loop
-                            break
-                        
-                        last_update = current_time
-                        time.sleep(1)
-                    
-                    # Try to clear the progress elements when done
-                    try:
-                        progress_placeholder.empty()
-                        status_placeholder.empty()
-                    except:
-                        # If UI elements are no longer accessible, just continue
-                        pass
-                        
-                except Exception as e:
-                    # Catch any other errors to prevent thread crashes
-                    print(f"Error in progress thread: {str(e)}")
-                    
-            # Start progress update in a separate thread
-            import threading
-            thread = threading.Thread(target=update_progress)
-            thread.daemon = True  # Make sure the thread doesn't block app exit
-            thread.start()
+            status_placeholder.write(f"Starting comprehensive product analysis. This typically takes about {TOTAL_ANALYSIS_TIME // 60}-{TOTAL_ANALYSIS_TIME // 60 + 1} minutes.")
+        
+        def on_status(status_data):
+            apply_status(status_data)
+            if progress_bar is not None:
+                stage = st.session_state.workflow_stage
+                progress_bar.progress(_progress_for_stage(stage))
+                status_placeholder.write(f"Analyzing product... (current step: {_STAGE_LABELS.get(stage, stage)})")
         
-        # Send the message to the API
-        response = requests.post(
-            f"{API_URL}/api/message",
-            json={"message": message}
-        )
+        def on_greeting(greeting):
+            add_message("assistant", greeting)
+            show_user_message(opening)
+        
+        # Show the reply token by token as it is generated
+        data = {}
+        try:
+            with chat_log if chat_log is not None else st.container():
+                # The greeting and the user message go above the reply
+                opening = st.container() if start else None
+                with st.chat_message("assistant"):
+                    st.write_stream(_stream_message(message, data, on_status, on_greeting if start else None))
+        finally:
+            if progress_bar is not None:
+                progress_placeholder.empty()
+                status_placeholder.empty()
+        if not data:
+            raise RuntimeError("The response stream ended before the reply was complete")
+        streamed = chat_log is not None
         
         # Always set is_analyzing to False when done, whether success or failure
         st.session_state.is_analyzing = False
         
-        if response.status_code == 200:
-            data = response.json()
-            # Add assistant response to chat
-            st.session_state.messages.append({"role": "assistant", "content": data["message"]})
-            # Update session state from API
-            update_session_state_from_api()
-        else:
-            st.error(f"Error sending message: {response.text}")
-            st.session_state.messages.append({"role": "assistant", "content": f"I'm sorry, there was an error processing your message. Please try again."})
+        # Add assistant response to chat
+        add_message("assistant", data["message"])
+        if streamed:
+            # Already on screen, so it doesn't need a rerun to show up
+            st.session_state.last_rendered = st.session_state.message_total
+        # The reply carries the updated workflow status, so no separate /api/status call is needed
+        apply_status(data)
+    except httpx.HTTPStatusError as e:
+        st.session_state.is_analyzing = False
+        st.error(f"Error sending message: {e.response.text}")
+        if user_shown:
+            add_message("assistant", "I'm sorry, there was an error processing your message. Please try again.")
     except Exception as e:
         # Make sure we set is_analyzing to False even if we have an exception
         st.session_state.is_analyzing = False
         st.error(f"Error connecting to API: {str(e)}")
-        st.session_state.messages.append({"role": "assistant", "content": f"I'm sorry, there was an error connecting to the service. Please check your connection and try again."})
+        if user_shown:
+            add_message("assistant", "I'm sorry, there was an error connecting to the service. Please check your connection and try again.")
 
 def display_chat():
     """Display the chat messages in a chat-like interface"""
     # Add explicit debug for message count
-    message_count = len(st.session_state.get("messages", []))
-    
-    # Debug container at the top - hidden by default in professional mode
-    debug_expander = st.expander("Debug Info", expanded=False)
-    with debug_expander:
-        st.write(f"Messages in state: {message_count}")
-        st.write(f"Current workflow stage: {st.session_state.get('workflow_stage', 'unknown')}")
-        st.write(f"Is analyzing: {st.session_state.get('is_analyzing', False)}")
-        
-        if message_count > 0:
-            st.write("Last message:")
-            st.json(st.session_state.messages[-1])
-        else:
-            st.write("No messages found in session state!")
+    message_count = len(st.session_state.contents)
+    
+    # Debug container at the top - only built when debug mode is on, since the
+    # last message can be a large JSON payload
+    if st.session_state.get("debug_mode"):
+        debug_expander = st.expander("Debug Info", expanded=False)
+        with debug_expander:
+            st.write(f"Messages in state: {message_count}")
+            st.write(f"Current workflow stage: {st.session_state.get('workflow_stage', 'unknown')}")
+            st.write(f"Is analyzing: {st.session_state.get('is_analyzing', False)}")
+            
+            if message_count > 0:
+                st.write("Last message:")
+                st.json({"role": st.session_state.roles[-1], "content": st.session_state.contents[-1]})
+            else:
+                st.write("No messages found in session state!")
     
     # Create a container with the appropriate bottom padding
     st.markdown('<div class="chat-container">', unsafe_allow_html=True)
     
+    # Only the most recent messages are rendered; older ones are loaded on request
+    window = st.session_state.get("visible_window", CHAT_WINDOW)
+    hidden_count = max(0, message_count - window)
+    if hidden_count:
+        st.button(f"Load older messages ({hidden_count} hidden)", key="load_older", on_click=show_older_messages)
+    
     # Display messages with better error handling
+    messages_container = st.container()
+    st.session_state.last_rendered = st.session_state.message_total - (message_count - hidden_count)
     if message_count > 0:
-        for i, message in enumerate(st.session_state.messages):
-            role = message.get("role", "unknown")
-            content = message.get("content", "No content")
-            
-            with st.chat_message(role):
-                st.write(content)
+        render_new_messages(messages_container)
     else:
-        st.info("No messages to display. Start the conversation by entering a message below.")
+        with messages_container:
+            st.info("No messages to display. Start the conversation by entering a message below.")
     
     # Display the "Thinking..." animation when analyzing
     if st.session_state.is_analyzing:
@@ -758,50 +1033,61 @@ def display_chat():
         # If animation_type is "none", we don't show anything (but this case shouldn't occur here)
             
     st.markdown('</div>', unsafe_allow_html=True)
+    
+    return messages_container
+
+def show_older_messages():
+    """Widen the chat window by another page of messages"""
+    st.session_state.visible_window = st.session_state.get("visible_window", CHAT_WINDOW) + CHAT_WINDOW
+
+def add_message(role, content):
+    """Append a message to the chat history"""
+    st.session_state.roles.append(role)
+    st.session_state.contents.append(content)
+    st.session_state.message_total += 1
+
+def render_new_messages(container):
+    """Append the messages added since the last render to `container`, leaving earlier ones as they are"""
+    roles = st.session_state.roles
+    contents = st.session_state.contents
+    total = st.session_state.message_total
+    new_count = min(total - st.session_state.get("last_rendered", 0), len(contents))
+    start = len(contents) - new_count
+    with container:
+        for role, content in zip(islice(roles, start, None), islice(contents, start, None)):
+            with st.chat_message(role):
+                st.write(content)
+    st.session_state.last_rendered = total
 
 def display_workflow_status():
     """Display the current workflow status"""
-    stages = {
-        "initial": "Initial",
-        "url_analysis": "Product Analysis",
-        "market_research": "Market Research",
-        "category_mapping": "Category Mapping",
-        "audience_segmentation": "Audience Segmentation",
-        "marketing_strategy": "Marketing Strategy",
-        "final_summary": "Final Summary"
-    }
-    
     current_stage = st.session_state.workflow_stage
     
-    st.sidebar.markdown("### Workflow Status")
+    st.markdown("### Workflow Status")
     
-    for stage, label in stages.items():
+    # Build all the status lines first so they go out as a single HTML element
+    html_parts = []
+    for stage, label in _STAGE_ITEMS:
         if stage == current_stage:
-            st.sidebar.markdown(f'<div class="status-current">→ {label} 🔍</div>', unsafe_allow_html=True)
+            html_parts.append(f'<div class="status-current">→ {label} 🔍</div>')
         elif stages_completed(stage, current_stage):
-            st.sidebar.markdown(f'<div class="status-complete">✓ {label}</div>', unsafe_allow_html=True)
+            html_parts.append(f'<div class="status-complete">✓ {label}</div>')
         else:
-            st.sidebar.markdown(f'<div class="status-pending">□ {label}</div>', unsafe_allow_html=True)
+            html_parts.append(f'<div class="status-pending">□ {label}</div>')
+    st.html("".join(html_parts))
 
 def stages_completed(stage, current_stage):
     """Check if a stage is completed based on the current stage"""
-    stage_order = [
-        "initial", 
-        "url_analysis", 
-        "market_research", 
-        "category_mapping", 
-        "audience_segmentation", 
-        "marketing_strategy", 
-        "final_summary"
-    ]
-    
-    if stage == current_stage:
-        return False
-    
-    stage_idx = stage_order.index(stage)
-    current_idx = stage_order.index(current_stage)
+    return _STAGE_INDEX[stage] < _STAGE_INDEX[current_stage]
+
+def render_tree_html(nodes: Tuple[str, ...]) -> str:
+    """
+    Build the tree markup for a list of subcategories or characteristics.
     
-    return stage_idx < current_idx
+    The nodes are joined into one HTML block so each list takes a single
+    st.html call.
+    """
+    return "".join(f'<div class="tree-node">└── {node}</div>' for node in nodes)
 
 def display_categories_as_dropdown():
     """Display categories as a dropdown with tree structure for subcategories"""
@@ -809,11 +1095,9 @@ def display_categories_as_dropdown():
         return
     
     categories = st.session_state.categories
-    st.sidebar.markdown("### Product Categories")
+    st.markdown("### Product Categories")
     
     for i, category in enumerate(categories):
-        category_id = f"category_{i}"
-        
         # Add type checking to handle different category data structures
         if isinstance(category, dict):
             category_name = category.get('name', 'Unknown')
@@ -828,20 +1112,18 @@ def display_categories_as_dropdown():
         
         # Use true Streamlit expander with custom styling
         if subcategories:
-            with st.sidebar.expander(f"📂 {category_name}", expanded=st.session_state.expanded_categories.get(category_id, False)):
-                # Display subcategories in a tree structure
-                for j, subcategory in enumerate(subcategories):
-                    # Handle subcategories that might be strings or dicts
-                    if isinstance(subcategory, dict) and 'name' in subcategory:
-                        subcategory_name = subcategory['name']
-                    else:
-                        subcategory_name = str(subcategory)
-                    
-                    # Display with tree-like indentation
-                    st.markdown(f'<div class="tree-node">└── {subcategory_name}</div>', unsafe_allow_html=True)
+            # Streamlit keeps the open/closed state in the browser as long as the label stays the same
+            with st.expander(f"📂 {category_name}"):
+                # Display subcategories in a tree structure, handling
+                # subcategories that might be strings or dicts
+                subcategory_names = tuple(
+                    subcategory['name'] if isinstance(subcategory, dict) and 'name' in subcategory else str(subcategory)
+                    for subcategory in subcategories
+                )
+                st.html(render_tree_html(subcategory_names))
         else:
             # Just show the category name if no subcategories
-            st.sidebar.markdown(f'<div class="category-item">📄 {category_name}</div>', unsafe_allow_html=True)
+            st.html(f'<div class="category-item">📄 {category_name}</div>')
 
 def display_audience_segments():
     """Display audience segments as proper dropdowns with tree structure"""
@@ -849,11 +1131,9 @@ def display_audience_segments():
         return
     
     segments = st.session_state.audience_segments
-    st.sidebar.markdown("### Audience Segments")
+    st.markdown("### Audience Segments")
     
     for i, segment in enumerate(segments):
-        segment_id = f"segment_{i}"
-        
         # Add type checking for segments too
         if isinstance(segment, dict):
             segment_name = segment.get('name', 'Unknown')
@@ -867,35 +1147,64 @@ def display_audience_segments():
         
         # Use true Streamlit expander with custom styling
         if characteristics:
-            with st.sidebar.expander(f"👥 {segment_name}", expanded=st.session_state.expanded_segments.get(segment_id, False)):
-                # Display characteristics in a tree structure
-                for j, characteristic in enumerate(characteristics):
-                    # Handle characteristics that might be strings or dicts
-                    if isinstance(characteristic, dict) and 'description' in characteristic:
-                        char_text = characteristic['description']
-                    else:
-                        char_text = str(characteristic)
-                    
-                    # Display with tree-like indentation and style
-                    st.markdown(f'<div class="tree-node">└── {char_text}</div>', unsafe_allow_html=True)
+            with st.expander(f"👥 {segment_name}"):
+                # Display characteristics in a tree structure, handling
+                # characteristics that might be strings or dicts
+                char_texts = tuple(
+                    characteristic['description'] if isinstance(characteristic, dict) and 'description' in characteristic else str(characteristic)
+                    for characteristic in characteristics
+                )
+                st.html(render_tree_html(char_texts))
         else:
             # Just show the segment name if no characteristics
-            st.sidebar.markdown(f'<div class="segment-item">👤 {segment_name}</div>', unsafe_allow_html=True)
+            st.html(f'<div class="segment-item">👤 {segment_name}</div>')
+
+def _sidebar_markdown():
+    """
+    Markdown for the product summary and strategy list.
+    
+    The strings are built once per status change and kept in the session
+    state; apply_status drops them whenever a new status arrives.
+    """
+    cached = st.session_state.get("_sidebar_md")
+    if cached is not None:
+        return cached
+    
+    # Basic product info
+    product_md = None
+    product_data = st.session_state.product_data
+    if product_data:
+        product_lines = ["### Product Summary", f"**Product:** {product_data.get('title', 'N/A')}"]
+        if 'price' in product_data:
+            product_lines.append(f"**Price:** {product_data.get('price', 'N/A')}")
+        product_md = "\n\n".join(product_lines)
+    
+    # Basic strategies info
+    strategies_md = None
+    strategies = st.session_state.strategies
+    if strategies:
+        strategy_lines = ["### Marketing Strategies", f"**Available strategies:** {len(strategies)}"]
+        for i, strategy in enumerate(strategies):
+            if isinstance(strategy, dict) and 'name' in strategy:
+                strategy_lines.append(f"• {strategy['name']}")
+            elif isinstance(strategy, str):
+                strategy_lines.append(f"• Strategy {i+1}")
+        strategies_md = "\n\n".join(strategy_lines)
+    
+    st.session_state._sidebar_md = (product_md, strategies_md)
+    return st.session_state._sidebar_md
 
 def display_basic_data():
     """Display basic data in the sidebar with professional styling"""
-    if st.session_state.workflow_stage == "initial":
+    workflow_stage = st.session_state.workflow_stage
+    if workflow_stage == "initial":
         return
     
-    st.sidebar.markdown("---")
+    st.markdown("---")
+    product_md, strategies_md = _sidebar_markdown()
     
-    # Basic product info
-    if st.session_state.product_data:
-        product_data = st.session_state.product_data
-        st.sidebar.markdown("### Product Summary")
-        st.sidebar.markdown(f"**Product:** {product_data.get('title', 'N/A')}")
-        if 'price' in product_data:
-            st.sidebar.markdown(f"**Price:** {product_data.get('price', 'N/A')}")
+    if product_md:
+        st.markdown(product_md)
     
     # Display categories in a dropdown format
     display_categories_as_dropdown()
@@ -903,39 +1212,31 @@ def display_basic_data():
     # Display audience segments in a structured way
     display_audience_segments()
     
-    # Basic strategies info
-    if st.session_state.strategies:
-        strategies = st.session_state.strategies
-        st.sidebar.markdown("### Marketing Strategies")
-        st.sidebar.markdown(f"**Available strategies:** {len(strategies)}")
-        for i, strategy in enumerate(strategies):
-            if isinstance(strategy, dict) and 'name' in strategy:
-                st.sidebar.markdown(f"• {strategy['name']}")
-            elif isinstance(strategy, str):
-                st.sidebar.markdown(f"• Strategy {i+1}")
+    if strategies_md:
+        st.markdown(strategies_md)
 
     # Hint for how to continue
-    if st.session_state.workflow_stage == "final_summary":
-        st.sidebar.markdown("---")
-        st.sidebar.info("💡 You can now ask questions about any part of the analysis or start a new analysis.")
+    if workflow_stage == "final_summary":
+        st.markdown("---")
+        st.info("💡 You can now ask questions about any part of the analysis or start a new analysis.")
 
 def reset_conversation():
     """Reset the conversation and workflow"""
     try:
-        response = requests.post(f"{API_URL}/api/reset")
+        response = _http().post("/api/reset")
         if response.status_code == 200:
+            # The old conversation's status updates are no longer wanted
+            stop_status_stream()
+            st.session_state.pop("status_events", None)
+            
             # Clear session state
-            st.session_state.messages = []
-            st.session_state.workflow_stage = "initial"
-            st.session_state.is_analyzing = False
-            st.session_state.thinking_animation_type = "auto"
-            st.session_state.product_data = None
-            st.session_state.market_data = None
-            st.session_state.categories = None
-            st.session_state.audience_segments = None
-            st.session_state.strategies = None
-            st.session_state.expanded_categories = {}
-            st.session_state.expanded_segments = {}
+            st.session_state.roles.clear()
+            st.session_state.contents.clear()
+            st.session_state.update(_WORKFLOW_DEFAULTS, message_total=0, visible_window=CHAT_WINDOW)
+            st.session_state.pop("_last_status_hash", None)
+            st.session_state.pop("_sidebar_md", None)
+            st.session_state.pop("last_etag", None)
+            _disk().delete(_snapshot_key())
             # Start a new conversation
             start_conversation()
         else:
@@ -943,14 +1244,117 @@ def reset_conversation():
     except Exception as e:
         st.error(f"Error connecting to API: {str(e)}")
 
+def rerun_chat_view():
+    """
+    Rerun just the chat view when it is running as a fragment rerun.
+    
+    chat_view also runs as part of full-app runs (first load, or after a
+    widget outside it), where a fragment-scoped rerun isn't allowed, so the
+    whole app is rerun instead.
+    """
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+@st.fragment
+def chat_view():
+    """
+    Chat history plus the input row.
+    
+    Runs as a fragment, so sending a message or loading older messages only
+    reruns this part of the page; the whole app reruns when the workflow
+    stage changes, since that updates the sidebar too.
+    """
+    chat_log = display_chat()
+    
+    # Create a fixed bottom container that holds both elements
+    st.markdown('<div class="fixed-bottom-container">', unsafe_allow_html=True)
+    st.markdown('<div class="input-container">', unsafe_allow_html=True)
+    
+    # Create columns inside the fixed container for the button and input
+    cols = st.columns([1, 6])
+    
+    # New Analysis button in the first column
+    with cols[0]:
+        if st.button("New Analysis", key="new_analysis_bottom", use_container_width=True):
+            reset_conversation()
+            st.rerun()
+    
+    is_analyzing = st.session_state.is_analyzing
+    
+    # Chat input in the second column
+    with cols[1]:
+        # A form hands over the message as a single submission, and both widgets
+        # are disabled while an analysis runs so it can't be submitted twice
+        with st.form("chat_form", clear_on_submit=True):
+            user_input = st.text_input(
+                "Message",
+                placeholder="Type your message here...",
+                key="chat_in",
+                label_visibility="collapsed",
+                disabled=is_analyzing
+            )
+            submitted = st.form_submit_button("Send", disabled=is_analyzing)
+        
+        if submitted and user_input and not is_analyzing:
+            stage_before = st.session_state.workflow_stage
+            
+            # Choose the thinking animation type based on message content
+            if _URL_RE.search(user_input) and stage_before == "initial":
+                # For URL analysis, use detailed animation
+                animation_type = "detailed"
+            elif _SIMPLE_RE.search(user_input):
+                # For quick questions, use simple animation
+                animation_type = "simple"
+            elif _DETAILED_RE.search(user_input):
+                # For analytical questions, use detailed animation
+                animation_type = "detailed"
+            else:
+                # Default to automatic behavior
+                animation_type = "auto"
+                
+            send_message(user_input, thinking_animation_type=animation_type, chat_log=chat_log)
+            
+            # Only rerun if the page is out of date - the sidebar only changes
+            # along with the workflow stage
+            if st.session_state.workflow_stage != stage_before:
+                st.rerun()
+            elif st.session_state.last_rendered < st.session_state.message_total:
+                rerun_chat_view()
+    
+    # Close the container divs
+    st.markdown('</div>', unsafe_allow_html=True)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# A new session starts out empty, so bring back the workflow it was showing before a reload
+if "status_restored" not in st.session_state:
+    st.session_state.status_restored = True
+    restore_status()
+
+# Pick up any workflow updates pushed since the last rerun, and keep checking
+# for more while the listener is running
+drain_status_events()
+if status_stream_running():
+    status_watcher()
+
 # Main app layout - clean and professional
 st.markdown("# Audience Andy")
 st.markdown("##### AI-Powered Audience Segmentation & Marketing Strategy")
 
-# Sidebar - clean, professional look
-with st.sidebar:
+def render_sidebar():
+    """
+    Logo, workflow status and analysis data for the sidebar.
+    
+    It has no widgets of its own, so it is only redrawn on full-app reruns,
+    such as the one chat_view triggers when the workflow stage changes.
+    """
     # Use a more professional logo placeholder
-    st.image("/home/srinivasan/FIles/frontend/agent/Group.png", width=150)
+    logo = _logo()
+    if logo:
+        st.image(logo, width=150)
+    else:
+        st.html(_LOGO_PLACEHOLDER)
     st.markdown("---")
     
     # Display workflow status
@@ -959,12 +1363,20 @@ with st.sidebar:
     # Display structured data
     display_basic_data()
 
+# Sidebar - clean, professional look
+with st.sidebar:
+    render_sidebar()
+    
+    # Debug tools are left out of production entirely unless STREAMLIT_DEBUG=1
+    if _DEBUG:
+        st.checkbox("Debug mode", key="debug_mode", value=True)
+
 # Main content area - only chat interface
 chat_container = st.container()
 
 with chat_container:
     # If no conversation has started yet, show a welcome message
-    if not st.session_state.messages:
+    if not st.session_state.contents:
         st.markdown("""
         ### Welcome to Audience Andy
         
@@ -978,67 +1390,34 @@ with chat_container:
         
         # Add a button to start the conversation only when the user is ready
         if st.button("Start Conversation", use_container_width=False):
-            # Debug section hidden by default
-            debug_container = st.expander("Debug Information", expanded=False)
-            
             # Call start_conversation and display debug info
             success = start_conversation()
             
             # Display debugging information
-            with debug_container:
+            if st.session_state.get("debug_mode"):
+                with st.expander("Debug Information", expanded=False):
                     st.write("Debug Info:", st.session_state.get("debug_info", "No debug info"))
                     st.write("API URL:", API_URL)
                     st.write("Initial Message:", st.session_state.get("debug_message", "No message received"))
                     st.write("Connection Error:", st.session_state.get("connection_error_shown", False))
                     st.write("Timeout Error:", st.session_state.get("timeout_error_shown", False))
                     st.write("Server Error:", st.session_state.get("server_error_shown", False))
-                    st.write("Message Count:", len(st.session_state.get("messages", [])))
-                    if st.session_state.get("messages"):
-                        st.write("Latest Message:", st.session_state.messages[-1])
+                    st.write("Message Count:", len(st.session_state.contents))
+                    if st.session_state.contents:
+                        st.write("Latest Message:", {"role": st.session_state.roles[-1], "content": st.session_state.contents[-1]})
             
             # Only rerun if we successfully started the conversation
             if success:
                 st.rerun()
             else:
-                st.warning("Could not start conversation. Check debug information for details.")
+                st.warning("Could not start conversation. Run with STREAMLIT_DEBUG=1 and turn on debug mode in the sidebar for details.")
+        
+        # Or skip the greeting round trip and start straight from a first message
+        with st.form("start_form", clear_on_submit=True):
+            first_message = st.text_input("Or paste a product URL to start right away", placeholder="Analyze https://...")
+            start_submitted = st.form_submit_button("Start analysis")
+        if start_submitted and first_message and start_and_send(first_message):
+            st.rerun()
     else:
         # Only display chat if we have messages
-        display_chat()
-        
-        # Create a fixed bottom container that holds both elements
-        st.markdown('<div class="fixed-bottom-container">', unsafe_allow_html=True)
-        st.markdown('<div class="input-container">', unsafe_allow_html=True)
-        
-        # Create columns inside the fixed container for the button and input
-        cols = st.columns([1, 6])
-        
-        # New Analysis button in the first column
-        with cols[0]:
-            if st.button("New Analysis", key="new_analysis_bottom", use_container_width=True):
-                reset_conversation()
-                st.rerun()
-        
-        # Chat input in the second column
-        with cols[1]:
-            user_input = st.chat_input("Type your message here...")
-            if user_input:
-                # Choose the thinking animation type based on message content
-                if "http" in user_input and st.session_state.workflow_stage == "initial":
-                    # For URL analysis, use detailed animation
-                    animation_type = "detailed"
-                elif any(keyword in user_input.lower() for keyword in ["quick", "fast", "simple", "quick question"]):
-                    # For quick questions, use simple animation
-                    animation_type = "simple"
-                elif any(keyword in user_input.lower() for keyword in ["analyze", "research", "explore", "investigate"]):
-                    # For analytical questions, use detailed animation
-                    animation_type = "detailed"
-                else:
-                    # Default to automatic behavior
-                    animation_type = "auto"
-                    
-                send_message(user_input, thinking_animation_type=animation_type)
-                st.rerun()
-        
-        # Close the container divs
-        st.markdown('</div>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True) 
\ No newline at end of file
+        chat_view() 
@@ -1,68 +1,29 @@
 from typing import Dict, List, Type, Optional, Any
 import logging
 from importlib import import_module
-import traceback
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import os
 from dotenv import load_dotenv
 
 from tools.base import Tool, ToolResult
-# Import tools individually to catch import errors
-try:
-    from tools.firecrawler_tool import FirecrawlerTool
-    FIRECRAWLER_AVAILABLE = True
-except ImportError as e:
-    FIRECRAWLER_AVAILABLE = False
-    logging.error(f"Error importing FirecrawlerTool: {str(e)}")
-
-try:
-    from tools.serp_analysis_tool import SerpAnalysisTool
-    SERPAPI_AVAILABLE = True
-except ImportError as e:
-    SERPAPI_AVAILABLE = False
-    logging.error(f"Error importing SerpAnalysisTool: {str(e)}")
-
-try:
-    from tools.category_tree_tool import CategoryTreeTool
-    CATEGORY_TREE_AVAILABLE = True
-except ImportError as e:
-    CATEGORY_TREE_AVAILABLE = False
-    logging.error(f"Error importing CategoryTreeTool: {str(e)}")
 
 logger = logging.getLogger(__name__)
 
 class ToolRegistry:
-    """Registry for managing available tools"""
+    """
+    Registry for managing available tools.
+    
+    Tools are constructed once when this module is imported. Every registered
+    tool then has an entry in _instances: the shared instance, or None if it
+    failed to initialize, with the reason kept in _init_errors.
+    """
     
     _tools: Dict[str, Type[Tool]] = {}
-    _instances: Dict[str, Tool] = {}
+    _instances: Dict[str, Optional[Tool]] = {}
     _init_errors: Dict[str, str] = {}
-    
-    @classmethod
-    def register(cls, tool_class: Type[Tool]) -> None:
-        """Register a tool class in the registry."""
-        try:
-            # Create a temporary instance to get the name
-            temp_instance = tool_class()
-            tool_name = temp_instance._get_name()  # Use _get_name directly
-            
-            # Store the class regardless of availability - we'll check during instantiation
-            cls._tools[tool_name] = tool_class
-            
-            # Check if the tool is available
-            if not temp_instance.is_available():
-                error_msg = f"Tool {tool_name} is not available: {getattr(temp_instance, 'initialization_error', 'Unknown error')}"
-                logger.error(error_msg)
-                cls._init_errors[tool_name] = error_msg
-                # Don't return here - we still register the class
-            else:
-                logger.info(f"Successfully registered tool class: {tool_name}")
-            
-        except Exception as e:
-            # If we can't get the name from the instance, use the class name
-            tool_name = tool_class.__name__
-            error_msg = f"Failed to register tool class {tool_name}: {str(e)}\n{traceback.format_exc()}"
-            logger.error(error_msg)
-            cls._init_errors[tool_name] = error_msg
+    _lock = threading.Lock()
+    _openai_functions: Optional[List[Dict[str, Any]]] = None
     
     @classmethod
     def get_tool_class(cls, name: str) -> Optional[Type[Tool]]:
@@ -76,32 +37,38 @@ class ToolRegistry:
     def get_tool(cls, name: str) -> Optional[Tool]:
         """
         Get a tool instance by name.
-        Creates a new instance if one doesn't exist.
+        Creates a new instance if one doesn't exist. Failures are recorded
+        as None so a broken tool isn't rebuilt on every call.
         """
         if name not in cls._instances:
-            tool_class = cls.get_tool_class(name)
-            if tool_class:
-                try:
-                    logger.info(f"Creating instance of tool: {name}")
-                    instance = tool_class()
+            # Concurrent callers must not construct the same tool twice
+            with cls._lock:
+                if name not in cls._instances:
+                    tool_class = cls.get_tool_class(name)
+                    if tool_class:
+                        try:
+                            logger.info(f"Creating instance of tool: {name}")
+                            instance = tool_class()
                     
-                    # Validate tool initialization
-                    if not instance.is_available():
-                        error_msg = f"Tool {name} is not available: {getattr(instance, 'initialization_error', 'Unknown error')}"
-                        logger.error(error_msg)
-                        cls._init_errors[name] = error_msg
-                        cls._instances[name] = None
+                            # Validate tool initialization
+                            if not instance.is_available():
+                                error_msg = f"Tool {name} is not available: {getattr(instance, 'initialization_error', 'Unknown error')}"
+                                logger.error(error_msg)
+                                cls._init_errors[name] = error_msg
+                                cls._instances[name] = None
+                            else:
+                                cls._instances[name] = instance
+                                cls._openai_functions = None
+                                logger.info(f"Successfully created instance of tool: {name}")
+                        except Exception as e:
+                            # logger.exception formats the traceback only if the record is emitted
+                            logger.exception("Error creating tool instance %s", name)
+                            cls._init_errors[name] = f"Error creating tool instance {name}: {type(e).__name__}: {e}"
+                            cls._instances[name] = None
                     else:
-                        cls._instances[name] = instance
-                        logger.info(f"Successfully created instance of tool: {name}")
-                except Exception as e:
-                    error_msg = f"Error creating tool instance {name}: {str(e)}\n{traceback.format_exc()}"
-                    logger.error(error_msg)
-                    cls._init_errors[name] = error_msg
-                    cls._instances[name] = None
-            else:
-                cls._init_errors[name] = f"Tool class {name} not found in registry"
-                logger.error(f"Tool class {name} not found in registry")
+                        cls._init_errors[name] = f"Tool class {name} not found in registry"
+                        cls._instances[name] = None
+                        logger.error(f"Tool class {name} not found in registry")
         
         # Check if the instance is fully initialized
         instance = cls._instances.get(name)
@@ -114,18 +81,15 @@ class ToolRegistry:
     @classmethod
     def get_all_tools(cls) -> List[Tool]:
         """Get instances of all available tools."""
-        # Make sure all tools are instantiated
-        for name in cls._tools.keys():
-            if name not in cls._instances:
-                cls.get_tool(name)  # This will handle initialization and error logging
-        
-        # Return only non-None instances
+        # Every registered tool already has an entry in _instances
         return [instance for instance in cls._instances.values() if instance is not None]
     
     @classmethod
     def get_available_tool_names(cls) -> List[str]:
         """Get a list of all available tool names."""
-        return list(cls._tools.keys())
+        # Tools that failed to initialize stay registered for status reporting,
+        # but aren't available
+        return [name for name in cls._tools if cls._instances.get(name) is not None]
     
     @classmethod
     def get_all_tools_as_dicts(cls) -> List[Dict[str, Any]]:
@@ -141,26 +105,28 @@ class ToolRegistry:
     
     @classmethod
     def get_openai_functions(cls) -> List[Dict[str, Any]]:
-        """Get all tools in OpenAI function format"""
-        tools = cls.get_all_tools()
-        functions = []
-        for tool in tools:
-            try:
-                functions.append(tool.to_openai_function())
-            except Exception as e:
-                logger.error(f"Error converting tool {tool.name} to OpenAI function: {str(e)}")
-        return functions
+        """
+        Get all tools in OpenAI function format.
+        The list is built once and reused until a new tool instance is added.
+        """
+        if cls._openai_functions is None:
+            functions = []
+            for tool in cls.get_all_tools():
+                try:
+                    functions.append(tool.to_openai_function())
+                except Exception as e:
+                    logger.error(f"Error converting tool {tool.name} to OpenAI function: {str(e)}")
+            cls._openai_functions = functions
+        # A copy, so a caller adding to the list can't change the cached one
+        return list(cls._openai_functions)
     
     @classmethod
     def get_initialization_status(cls) -> Dict[str, str]:
         """Get the initialization status of all tools"""
-        # Ensure all tools have been initialized
-        for name in cls._tools.keys():
-            cls.get_tool(name)  # This will initialize the tool if not already initialized
-            
+        # Instances are created when the module is imported, so just read them
         result = {}
         for name in cls._tools.keys():
-            if name in cls._instances and cls._instances[name] is not None:
+            if cls._instances.get(name) is not None:
                 result[name] = "initialized"
             else:
                 result[name] = cls._init_errors.get(name, "unknown error")
@@ -189,75 +155,97 @@ class ToolRegistry:
             logger.info(f"Tool execution completed: {tool_name}, success: {result.success}")
             return result
         except Exception as e:
-            error_msg = f"Error executing tool {tool_name}: {str(e)}\n{traceback.format_exc()}"
-            logger.error(error_msg)
+            logger.exception("Error executing tool %s", tool_name)
             return ToolResult(
                 success=False,
-                error=error_msg,
+                error=f"Error executing tool {tool_name}: {type(e).__name__}: {e}",
                 tool_name=tool_name
             )
 
 # Load environment variables
 load_dotenv()
 
-# Direct registration of tool instances - more reliable than class registration
-logger.info("Directly registering tool instances...")
+# Tools to register at import time, as (module, class name, tool name)
+_TOOL_SPECS = (
+    ("tools.firecrawler_tool", "FirecrawlerTool", "firecrawler"),
+    ("tools.serp_analysis_tool", "SerpAnalysisTool", "serp_analysis"),
+    ("tools.category_tree_tool", "CategoryTreeTool", "category_tree"),
+)
 
-# Clean initialization to avoid redundant instantiations
-firecrawler_tool = None
-serp_analysis_tool = None
-category_tree_tool = None
+def _load_tool_class(module_name: str, class_name: str) -> Optional[Type[Tool]]:
+    """Import a tool class, returning None if its module can't be imported"""
+    try:
+        return getattr(import_module(module_name), class_name)
+    except ImportError as e:
+        logger.error(f"Error importing {class_name}: {str(e)}")
+        return None
 
-try:
-    if FIRECRAWLER_AVAILABLE:
-        logger.info("Creating FirecrawlerTool instance")
-        firecrawler_tool = FirecrawlerTool()
-        firecrawler_name = firecrawler_tool._get_name()
-        if firecrawler_tool.is_available():
-            logger.info(f"Successfully created FirecrawlerTool with name: {firecrawler_name}")
-            ToolRegistry._tools[firecrawler_name] = FirecrawlerTool
-            ToolRegistry._instances[firecrawler_name] = firecrawler_tool
-        else:
-            logger.error(f"FirecrawlerTool not available: {firecrawler_tool.initialization_error}")
-            ToolRegistry._init_errors[firecrawler_name] = firecrawler_tool.initialization_error
-    else:
-        logger.error("FirecrawlerTool not available - skipping registration")
-except Exception as e:
-    logger.error(f"Error registering FirecrawlerTool: {str(e)}")
+def _create_tool(tool_name: str, tool_class: Type[Tool]) -> Optional[Tool]:
+    """
+    Construct a tool, returning None if its constructor raises.
+    
+    A tool whose constructor raises is registered under its tool name with no
+    instance and the error, so lookups report why it is missing.
+    """
+    try:
+        logger.info(f"Creating {tool_class.__name__} instance")
+        return tool_class()
+    except Exception as e:
+        logger.exception("Error creating %s", tool_class.__name__)
+        with ToolRegistry._lock:
+            ToolRegistry._tools[tool_name] = tool_class
+            ToolRegistry._init_errors[tool_name] = f"Error creating tool instance {tool_name}: {type(e).__name__}: {e}"
+            ToolRegistry._instances[tool_name] = None
+        return None
 
-try:
-    if SERPAPI_AVAILABLE:
-        logger.info("Creating SerpAnalysisTool instance")
-        serp_analysis_tool = SerpAnalysisTool()
-        serp_name = serp_analysis_tool._get_name()
-        if serp_analysis_tool.is_available():
-            logger.info(f"Successfully created SerpAnalysisTool with name: {serp_name}")
-            ToolRegistry._tools[serp_name] = SerpAnalysisTool
-            ToolRegistry._instances[serp_name] = serp_analysis_tool
+def _register_tool(tool_class: Type[Tool], tool: Tool) -> None:
+    """
+    Add the shared instance of a tool to the registry.
+    
+    A tool that fails to initialize is still registered, with no instance and
+    its error recorded, so lookups report the real error instead of retrying
+    the construction.
+    """
+    tool_label = tool_class.__name__
+    try:
+        tool_name = tool._get_name()
+        ToolRegistry._tools[tool_name] = tool_class
+        if tool.is_available():
+            logger.info(f"Successfully created {tool_label} with name: {tool_name}")
+            ToolRegistry._instances[tool_name] = tool
+            ToolRegistry._openai_functions = None
         else:
-            logger.error(f"SerpAnalysisTool not available: {serp_analysis_tool.initialization_error}")
-            ToolRegistry._init_errors[serp_name] = serp_analysis_tool.initialization_error
-    else:
-        logger.error("SerpAnalysisTool not available - skipping registration")
-except Exception as e:
-    logger.error(f"Error registering SerpAnalysisTool: {str(e)}")
+            logger.error(f"{tool_label} not available: {tool.initialization_error}")
+            ToolRegistry._init_errors[tool_name] = tool.initialization_error
+            ToolRegistry._instances[tool_name] = None
+    except Exception:
+        logger.exception("Error registering %s", tool_label)
 
-try:
-    if CATEGORY_TREE_AVAILABLE:
-        logger.info("Creating CategoryTreeTool instance")
-        category_tree_tool = CategoryTreeTool()
-        category_name = category_tree_tool._get_name()
-        if category_tree_tool.is_available():
-            logger.info(f"Successfully created CategoryTreeTool with name: {category_name}")
-            ToolRegistry._tools[category_name] = CategoryTreeTool
-            ToolRegistry._instances[category_name] = category_tree_tool
-        else:
-            logger.error(f"CategoryTreeTool not available: {category_tree_tool.initialization_error}")
-            ToolRegistry._init_errors[category_name] = category_tree_tool.initialization_error
-    else:
-        logger.error("CategoryTreeTool not available - skipping registration")
-except Exception as e:
-    logger.error(f"Error registering CategoryTreeTool: {str(e)}")
+# Register the tools whose modules imported successfully
+logger.info("Registering tool instances...")
+
+_tool_names = []
+_tool_classes = []
+for module_name, class_name, tool_name in _TOOL_SPECS:
+    tool_class = _load_tool_class(module_name, class_name)
+    if tool_class is None:
+        logger.error(f"{class_name} not available - skipping registration")
+    elif tool_class not in ToolRegistry._tools.values():
+        _tool_names.append(tool_name)
+        _tool_classes.append(tool_class)
+
+# Each tool is constructed exactly once. With TOOLS_PARALLEL_INIT=1 the
+# constructors run side by side, so startup waits for the slowest tool rather
+# than the sum of them; registration order stays the same either way.
+if os.getenv("TOOLS_PARALLEL_INIT") == "1" and len(_tool_classes) > 1:
+    with ThreadPoolExecutor(max_workers=len(_tool_classes)) as executor:
+        _created_tools = list(executor.map(_create_tool, _tool_names, _tool_classes))
+else:
+    _created_tools = [_create_tool(tool_name, tool_class) for tool_name, tool_class in zip(_tool_names, _tool_classes)]
+
+for tool_class, tool in zip(_tool_classes, _created_tools):
+    if tool is not None:
+        _register_tool(tool_class, tool)
 
 # Create a global instance of the tool registry
 tool_registry = ToolRegistry()
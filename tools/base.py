@@ -6,6 +6,9 @@ logger = logging.getLogger(__name__)
 
 class ToolResult:
     """Standardized result from tool execution"""
+    # One of these is created per tool call, so skip the per-instance __dict__
+    __slots__ = ("success", "result", "error", "tool_name")
+    
     def __init__(self, 
                 success: bool, 
                 result: Optional[Dict[str, Any]] = None, 
@@ -35,6 +38,7 @@ class Tool(ABC):
         self._description = None
         self._parameters = None
         self._required_parameters = None
+        self._openai_function = None
     
     @property
     def name(self) -> str:
@@ -124,16 +128,18 @@ class Tool(ABC):
         }
     
     def to_openai_function(self) -> Dict[str, Any]:
-        """Convert to OpenAI function format"""
-        return {
-            "type": "function",
-            "function": {
-                "name": self.name,
-                "description": self.description,
-                "parameters": {
-                    "type": "object",
-                    "properties": self.parameters,
-                    "required": self.required_parameters
+        """Convert to OpenAI function format, building the definition only once"""
+        if self._openai_function is None:
+            self._openai_function = {
+                "type": "function",
+                "function": {
+                    "name": self.name,
+                    "description": self.description,
+                    "parameters": {
+                        "type": "object",
+                        "properties": self.parameters,
+                        "required": self.required_parameters
+                    }
                 }
             }
-        } 
\ No newline at end of file
+        return self._openai_function 
\ No newline at end of file
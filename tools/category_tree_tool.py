@@ -1,31 +1,214 @@
+import asyncio
+import heapq
 import json
 import os
 import logging
-import traceback
-from typing import Dict, List, Optional, Any, Union
+import mmap
+import re
+import threading
+from itertools import chain
+from operator import attrgetter
+from typing import Dict, List, NamedTuple, Optional, Any, Tuple, Union
 from pathlib import Path
+from types import MappingProxyType
+import orjson
 from dotenv import load_dotenv
 
 from tools.base import Tool, ToolResult
 
 logger = logging.getLogger(__name__)
 
+# Load the .env file once, not on every instantiation
+load_dotenv()
+
+class _SubcategoryTerms(NamedTuple):
+    """A subcategory with its matchable text lowercased ahead of time."""
+    subcategory: Dict[str, Any]
+    name: str
+    description: Optional[str]
+    values: Optional[Tuple[Tuple[str, str], ...]]
+    subcategories: Optional[Tuple["_SubcategoryTerms", ...]]
+
+def _read_categories_file(path: Path) -> Dict:
+    """
+    Parse a categories JSON file with orjson.
+    
+    The file is memory-mapped and handed to orjson as a buffer, so it isn't
+    copied into a separate bytes object first.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as buffer:
+            return orjson.loads(buffer)
+
+# Segments added when the matched categories produce only a few specific ones:
+# value-conscious, convenience and quality-focused shoppers. Read-only, so
+# every result gets its own copies.
+_GENERAL_SEGMENTS = (
+    MappingProxyType({
+        "name": "Value-Conscious Shoppers",
+        "description": "Price-sensitive consumers who compare options before purchasing",
+        "targeting_criteria": (
+            MappingProxyType({
+                "type": "behavior",
+                "category": "Shopping Behavior",
+                "value": "Price Comparison"
+            }),
+            MappingProxyType({
+                "type": "behavior",
+                "category": "Shopping Behavior",
+                "value": "Coupon User"
+            })
+        )
+    }),
+    MappingProxyType({
+        "name": "Convenience Shoppers",
+        "description": "Consumers who prioritize ease of purchase and quick delivery",
+        "targeting_criteria": (
+            MappingProxyType({
+                "type": "behavior",
+                "category": "Shopping Behavior",
+                "value": "Online Shopper"
+            }),
+            MappingProxyType({
+                "type": "behavior",
+                "category": "Shopping Behavior",
+                "value": "Fast Shipping"
+            })
+        )
+    }),
+    MappingProxyType({
+        "name": "Quality-Focused Consumers",
+        "description": "Shoppers who prioritize product quality and durability over price",
+        "targeting_criteria": (
+            MappingProxyType({
+                "type": "behavior",
+                "category": "Shopping Behavior",
+                "value": "Quality-Driven"
+            }),
+            MappingProxyType({
+                "type": "demographic",
+                "category": "Income",
+                "value": "Above Average"
+            })
+        )
+    })
+)
+
+# Basic keyword mapping
+_KEYWORD_MAP = MappingProxyType({
+    "Demographics": ("age", "gender", "education", "marital status", "ethnicity"),
+    "Financial": ("money", "income", "wealth", "finance", "investment", "budget"),
+    "Home": ("house", "apartment", "residence", "property", "rent", "mortgage"),
+    "Life Events": ("wedding", "marriage", "engagement", "birthday", "anniversary", "graduation"),
+    "Interests": ("hobby", "passion", "activity", "entertainment", "leisure"),
+    "Shopping and Fashion": ("clothes", "style", "trend", "retail", "purchase", "buy"),
+    "Technology": ("tech", "gadget", "device", "digital", "electronic", "computer"),
+    "Behaviors": ("habit", "pattern", "routine", "lifestyle", "behavior")
+})
+
+_TECH_RE = re.compile(r"Technology|Electronics")
+_FASHION_RE = re.compile(r"Fashion|Clothing|Apparel")
+_HOME_RE = re.compile(r"Home|Furniture|Decor")
+
+# Extra segments for categories whose name matches a pattern; each adds an
+# interest in the matched category plus the template's own criterion
+_SEGMENT_RULES = (
+    (_TECH_RE, MappingProxyType({
+        "name": "Tech Early Adopters",
+        "description": "People who seek out the latest technology products and innovations",
+        "criterion": MappingProxyType({
+            "type": "behavior",
+            "category": "Technology",
+            "value": "Early Adopter"
+        })
+    })),
+    (_FASHION_RE, MappingProxyType({
+        "name": "Fashion-Forward Consumers",
+        "description": "Style-conscious consumers who follow trends and fashion innovations",
+        "criterion": MappingProxyType({
+            "type": "demographic",
+            "category": "Shopping Behavior",
+            "value": "Trend-Driven"
+        })
+    })),
+    (_HOME_RE, MappingProxyType({
+        "name": "Home Improvement Enthusiasts",
+        "description": "People actively enhancing or renovating their living spaces",
+        "criterion": MappingProxyType({
+            "type": "life_event",
+            "category": "Home",
+            "value": "Moving/Renovating"
+        })
+    }))
+)
+
+class _CategoryScore(NamedTuple):
+    """A top-level category that scored, by its index in the tree."""
+    index: int
+    score: int
+
+class _SubcategoryScore(NamedTuple):
+    """A subcategory that scored, before it is turned into a result dict."""
+    subcategory: Dict[str, Any]
+    score: int
+    subcategories: List[Dict[str, Any]]
+    matched_values: List[str]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the result format, leaving out empty nested data."""
+        subcategory_data = {
+            "name": self.subcategory["name"],
+            "description": self.subcategory.get("description", ""),
+            "score": self.score
+        }
+        
+        if self.subcategories:
+            subcategory_data["subcategories"] = self.subcategories
+            
+        if self.matched_values:
+            subcategory_data["matched_values"] = self.matched_values
+        
+        return subcategory_data
+
 class CategoryTreeTool(Tool):
     """Tool for navigating and analyzing marketing categories."""
     
+    # Attributes built from the category file, shared by every instance
+    _SHARED_ATTRS = (
+        "categories", "_term_hits", "_general_indices", "_default_index",
+        "_empty_input_result", "_subcategory_terms", "_subcategory_all_terms",
+        "_top_level_categories", "_subcategories_by_name",
+    )
+    _shared_state: Optional[Dict[str, Any]] = None
+    _init_lock = threading.Lock()
+    
     def __init__(self):
         """Initialize the CategoryTreeTool."""
         super().__init__()
-        # Explicitly load .env file
-        load_dotenv()
         
         # Load the category tree from the JSON file
         try:
-            self.categories = self._load_categories()
+            self._ensure_loaded()
         except Exception as e:
             self.initialization_error = str(e)
             logger.error(f"Error initializing CategoryTreeTool: {str(e)}")
     
+    def _ensure_loaded(self) -> None:
+        """
+        Load and preprocess the category tree once per process.
+        The first instance builds the state; later ones just take a reference
+        to it. A failed load isn't cached, so the next instance retries.
+        """
+        cls = type(self)
+        with cls._init_lock:
+            if cls._shared_state is None:
+                self.categories = self._load_categories()
+                self._build_match_index()
+                self._build_explore_cache()
+                cls._shared_state = {name: getattr(self, name) for name in cls._SHARED_ATTRS}
+                return
+        self.__dict__.update(cls._shared_state)
+    
     def _get_name(self) -> str:
         return "category_tree"
     
@@ -63,11 +246,10 @@ class CategoryTreeTool(Tool):
         for path in potential_paths:
             try:
                 logger.info(f"Attempting to load marketing categories from: {path}")
-                with open(path, 'r') as f:
-                    data = json.load(f)
+                data = _read_categories_file(path)
                 logger.info(f"Successfully loaded marketing categories from: {path}")
                 return data
-            except (FileNotFoundError, json.JSONDecodeError) as e:
+            except (FileNotFoundError, json.JSONDecodeError, ValueError) as e:
                 logger.warning(f"Failed to load from {path}: {e}")
                 continue
         
@@ -98,11 +280,7 @@ class CategoryTreeTool(Tool):
             if not self.is_available():
                 error_msg = f"Category tree tool is not available: {self.initialization_error}"
                 logger.error(error_msg)
-                return ToolResult(
-                    success=False,
-                    error=error_msg,
-                    tool_name=self.name
-                )
+                return self._fail(error_msg)
             
             product_description = parameters.get("product_description", "")
             product_features = parameters.get("product_features", [])
@@ -112,86 +290,91 @@ class CategoryTreeTool(Tool):
             mode = parameters.get("mode", "match")
             parent_category = parameters.get("parent_category", "")
             
-            # Different modes of operation
+            # Different modes of operation; the exploration listings are
+            # prebuilt at load time, since the tree doesn't change
             if mode == "explore_toplevel":
-                logger.info("Getting all top-level categories for LLM to choose from")
-                top_categories = self._get_all_top_level_categories()
-                
-                result = {
-                    "categories": top_categories,
+                logger.info(f"Returning {len(self._top_level_categories)} top-level categories for LLM exploration")
+                return self._succeed({
+                    "categories": self._get_all_top_level_categories(),
                     "mode": "explore_toplevel",
                     "audience_segments": []  # No segments in exploration mode
-                }
-                
-                logger.info(f"Returning {len(top_categories)} top-level categories for LLM exploration")
-                return ToolResult(
-                    success=True,
-                    result=result,
-                    error=None,
-                    tool_name=self.name
-                )
+                })
                 
             elif mode == "explore_subcategories" and parent_category:
-                logger.info(f"Getting subcategories for category: {parent_category}")
-                subcategories = self._get_subcategories_for_category(parent_category)
-                
-                result = {
-                    "parent_category": parent_category,
-                    "subcategories": subcategories,
-                    "mode": "explore_subcategories",
-                    "audience_segments": []  # No segments in exploration mode
-                }
-                
-                logger.info(f"Returning {len(subcategories)} subcategories for parent category: {parent_category}")
-                return ToolResult(
-                    success=True,
-                    result=result,
-                    error=None,
-                    tool_name=self.name
-                )
-            
-            # Default "match" mode - existing behavior
-            # Check if this is a request for top-level categories (empty input)
-            if not product_description.strip() and not product_features and not product_keywords:
-                logger.info("Detected request for top-level categories (empty input data)")
-            else:
-                logger.info(f"Executing category tree tool with description: {product_description[:50]}...")
+                result = self._build_subcategory_result(parent_category)
+                logger.info(f"Returning {len(result.result['subcategories'])} subcategories for parent category: {parent_category}")
+                return result
             
-            # For now, implement a simple keyword matching algorithm
-            # In a real implementation, this would use embeddings or more sophisticated matching
-            matched_categories = self._match_categories(
-                product_description, 
+            # Default "match" mode - scoring is CPU-bound, so keep it off the event loop
+            return await asyncio.to_thread(
+                self._match_sync,
+                product_description,
                 product_features,
                 product_keywords,
                 max_categories,
                 max_subcategories
             )
             
-            audience_segments = self._generate_audience_segments(matched_categories)
-            
-            result = {
-                "matched_categories": matched_categories,
-                "audience_segments": audience_segments,
-                "mode": "match"
-            }
-            
-            logger.info(f"Category mapping completed with {len(matched_categories)} categories and {len(audience_segments)} audience segments")
-            
-            return ToolResult(
-                success=True,
-                result=result,
-                error=None,
-                tool_name=self.name
-            )
-            
         except Exception as e:
-            error_msg = f"Error executing category tree tool: {str(e)}\n{traceback.format_exc()}"
-            logger.error(error_msg)
-            return ToolResult(
-                success=False,
-                error=error_msg,
-                tool_name=self.name
-            )
+            # exc_info leaves formatting the traceback to the logging handler
+            logger.error("Error executing category tree tool", exc_info=True)
+            return self._fail(f"Error executing category tree tool: {type(e).__name__}: {e}")
+    
+    def _match_sync(
+        self,
+        product_description: str,
+        product_features: List[str],
+        product_keywords: List[str],
+        max_categories: int,
+        max_subcategories: int
+    ) -> ToolResult:
+        """Match the product to categories and build its audience segments."""
+        # Check if this is a request for top-level categories (empty input)
+        is_empty = not product_description.strip() and not product_features and not product_keywords
+        if is_empty:
+            logger.info("Detected request for top-level categories (empty input data)")
+        else:
+            logger.info(f"Executing category tree tool with description: {product_description[:50]}...")
+        
+        # For now, implement a simple keyword matching algorithm
+        # In a real implementation, this would use embeddings or more sophisticated matching
+        matched_categories = self._match_categories(
+            product_description, 
+            product_features,
+            product_keywords,
+            max_categories,
+            max_subcategories,
+            is_empty
+        )
+        
+        audience_segments = self._generate_audience_segments(matched_categories)
+        
+        result = {
+            "matched_categories": matched_categories,
+            "audience_segments": audience_segments,
+            "mode": "match"
+        }
+        
+        logger.info(f"Category mapping completed with {len(matched_categories)} categories and {len(audience_segments)} audience segments")
+        
+        return self._succeed(result)
+    
+    def _build_subcategory_result(self, parent_category: str) -> ToolResult:
+        """Build the explore_subcategories result for a parent category."""
+        return self._succeed({
+            "parent_category": parent_category,
+            "subcategories": self._get_subcategories_for_category(parent_category),
+            "mode": "explore_subcategories",
+            "audience_segments": []  # No segments in exploration mode
+        })
+    
+    def _succeed(self, result: Dict[str, Any]) -> ToolResult:
+        """Wrap a successful result."""
+        return ToolResult(success=True, result=result, error=None, tool_name=self.name)
+    
+    def _fail(self, error_msg: str) -> ToolResult:
+        """Wrap an error message in a failed result."""
+        return ToolResult(success=False, error=error_msg, tool_name=self.name)
     
     def _match_categories(
         self, 
@@ -199,11 +382,15 @@ class CategoryTreeTool(Tool):
         features: List[str],
         keywords: List[str],
         max_categories: int,
-        max_subcategories: int
+        max_subcategories: int,
+        is_empty: bool
     ) -> List[Dict[str, Any]]:
         """
         Match product info to categories.
         
+        is_empty is set when there is no description, features or keywords to
+        match; every top-level category is then listed instead.
+        
         This is a simplified implementation. In a production system, this would use:
         - Semantic similarity with embeddings
         - Classification models
@@ -211,109 +398,80 @@ class CategoryTreeTool(Tool):
         
         For now, we'll implement a basic keyword matching approach.
         """
+        # Check if we have any meaningful input data
+        if is_empty:
+            logger.info("No input data provided - returning all top-level categories instead of matching")
+            # Return all top-level categories when no input is provided, as
+            # fresh copies of the listing sorted at load time
+            all_categories = [
+                dict(category, subcategories=[])
+                for category in self._empty_input_result[:max_categories]
+            ]
+            logger.info(f"Returning {len(all_categories)} top-level categories without matching")
+            return all_categories
+        
         logger.info(f"Starting category matching with description length: {len(description)}, "
                    f"features count: {len(features)}, keywords count: {len(keywords)}")
         
-        # Check if we have any meaningful input data
-        if not description.strip() and not features and not keywords:
-            logger.info("No input data provided - returning all top-level categories instead of matching")
-            # Return all top-level categories when no input is provided
-            all_categories = []
-            for category in self.categories.get("categories", []):
-                all_categories.append({
-                    "category": category["name"],
-                    "description": category.get("description", ""),
-                    "score": 5,  # Default score
-                    "subcategories": []  # Empty subcategories since no matching was done
-                })
-            
-            # Sort alphabetically and return up to max_categories
-            all_categories.sort(key=lambda x: x["category"])
-            logger.info(f"Returning {min(len(all_categories), max_categories)} top-level categories without matching")
-            return all_categories[:max_categories]
-            
         # For all other cases, continue with the existing matching logic
         # Combine all product info into a single string for matching
-        all_text = " ".join([description] + features + keywords).lower()
+        all_text = " ".join(chain((description,), features, keywords)).lower()
         logger.info(f"Combined text length for matching: {len(all_text)}")
         
-        # Store matches with a simple score based on keyword occurrences
-        category_scores = []
-        
         # Log available categories for debugging
         available_categories = [cat.get("name", "Unnamed") for cat in self.categories.get("categories", [])]
         logger.info(f"Available top-level categories for matching: {available_categories}")
         
-        for category in self.categories.get("categories", []):
-            score = 0
-            cat_name = category["name"].lower()
-            
-            # Match category name
-            if cat_name in all_text:
-                score += 10
-                logger.debug(f"Found exact match for category: {cat_name}")
-            
-            # Match partial category name (more lenient)
-            for word in cat_name.split():
-                if len(word) > 3 and word in all_text:  # Only consider words longer than 3 chars
-                    score += 3
-                    logger.debug(f"Found partial match for category word: {word}")
-            
-            # Match category description
-            if "description" in category and category["description"].lower() in all_text:
-                score += 5
-                logger.debug(f"Found match in category description for: {cat_name}")
-                
-            # Also check for related keywords in the entire text
-            related_keywords = self._get_keywords_for_category(category["name"])
-            matched_keywords = []
-            for keyword in related_keywords:
-                if keyword.lower() in all_text:
-                    score += 2
-                    matched_keywords.append(keyword)
-            
-            if matched_keywords:
-                logger.debug(f"Matched keywords for {cat_name}: {matched_keywords}")
-            
-            # Even if no direct match, give a small base score to ensure we have some categories
-            if score == 0:
-                # Give a small score based on general relevance
-                if "general" in cat_name or "product" in cat_name or "consumer" in cat_name:
-                    score += 1
-                    logger.debug(f"Assigning base score to general category: {cat_name}")
-            
-            if score > 0:
-                subcategories = self._match_subcategories(category, all_text, max_subcategories)
-                category_scores.append({
-                    "category": category["name"],
-                    "description": category.get("description", ""),
-                    "score": score,
-                    "subcategories": subcategories
-                })
+        # Look for each distinct term once and credit every category it scores;
+        # only categories with a hit become candidates
+        categories = self.categories.get("categories", [])
+        scores: Dict[int, int] = {}
+        for term, hits in self._term_hits.items():
+            if term in all_text:
+                logger.debug(f"Found match for term: {term}")
+                for index, weight in hits:
+                    scores[index] = scores.get(index, 0) + weight
+        
+        # Even if no direct match, give a small base score to general categories
+        # to ensure we have some categories
+        for index in self._general_indices:
+            if index not in scores:
+                scores[index] = 1
+                logger.debug(f"Assigning base score to general category: {categories[index]['name']}")
         
-        # Sort by score and take the top categories
-        category_scores.sort(key=lambda x: x["score"], reverse=True)
+        # Visit the candidates in tree order so ties keep their original order,
+        # and only match subcategories for the ones that make the cut
+        candidates = [_CategoryScore(index, scores[index]) for index in sorted(scores)]
+        top_candidates = heapq.nlargest(max_categories, candidates, key=attrgetter("score"))
+        result = [
+            {
+                "category": categories[candidate.index]["name"],
+                "description": categories[candidate.index].get("description", ""),
+                "score": candidate.score,
+                "subcategories": self._match_category_subcategories(candidate.index, all_text, max_subcategories)
+            }
+            for candidate in top_candidates
+        ]
         
         # If no categories matched, provide at least one default category
-        if not category_scores:
+        if not candidates:
             logger.warning("No category matches found, creating default category")
             # Look for a generic category in the available categories
-            default_category = next((cat for cat in self.categories.get("categories", []) 
-                                    if "general" in cat["name"].lower() or "consumer" in cat["name"].lower()),
-                                    None)
+            default_index = self._default_index
             
-            if default_category:
+            if default_index is not None:
+                default_category = categories[default_index]
                 logger.info(f"Using existing general category: {default_category['name']}")
-                category_scores.append({
+                default_match = {
                     "category": default_category["name"],
                     "description": default_category.get("description", "General products category"),
                     "score": 1,
-                    "subcategories": self._match_subcategories(default_category, all_text, max_subcategories)
-                })
+                    "subcategories": self._match_category_subcategories(default_index, all_text, max_subcategories)
+                }
             else:
                 logger.info("Creating completely new default category")
                 # Create a completely new default category
-                category_scores.append({
+                default_match = {
                     "category": "General Consumer Products",
                     "description": "Products intended for general consumer use",
                     "score": 1,
@@ -322,87 +480,155 @@ class CategoryTreeTool(Tool):
                         "description": "Products available for purchase online",
                         "score": 1
                     }]
-                })
+                }
+            result = [default_match] if max_categories > 0 else []
         
-        result = category_scores[:max_categories]
         logger.info(f"Returning {len(result)} categories. Top category: {result[0]['category'] if result else 'None'}")
         return result
     
+    def _build_match_index(self) -> None:
+        """
+        Index the terms that score top-level categories.
+        
+        Maps each distinct lowercased term to the (category index, weight)
+        pairs it scores: the full category name (10), each name word longer
+        than 3 characters (3), the description (5) and each related keyword (2).
+        A match then only has to look for each term in the text once, however
+        many categories share it.
+        """
+        term_hits: Dict[str, List[Tuple[int, int]]] = {}
+        for index, category in enumerate(self.categories.get("categories", [])):
+            cat_name = category["name"].lower()
+            terms = [(cat_name, 10)]
+            terms.extend((word, 3) for word in cat_name.split() if len(word) > 3)
+            if "description" in category:
+                terms.append((category["description"].lower(), 5))
+            terms.extend((keyword.lower(), 2) for keyword in self._get_keywords_for_category(category["name"]))
+            
+            for term, weight in terms:
+                term_hits.setdefault(term, []).append((index, weight))
+        
+        self._term_hits = term_hits
+        
+        # Categories that get a base score without any match, and the one used
+        # as a fallback when nothing scores at all
+        names = [category["name"].lower() for category in self.categories.get("categories", [])]
+        self._general_indices = [
+            index for index, name in enumerate(names)
+            if "general" in name or "product" in name or "consumer" in name
+        ]
+        self._default_index = next(
+            (index for index, name in enumerate(names) if "general" in name or "consumer" in name),
+            None
+        )
+        
+        # The listing returned when there is no input to match, in alphabetical order
+        self._empty_input_result = tuple(sorted(
+            (
+                {
+                    "category": category["name"],
+                    "description": category.get("description", ""),
+                    "score": 5,  # Default score
+                    "subcategories": []  # Empty subcategories since no matching was done
+                }
+                for category in self.categories.get("categories", [])
+            ),
+            key=lambda x: x["category"]
+        ))
+        
+        self._subcategory_terms = [
+            self._prepare_subcategories(category["subcategories"]) if "subcategories" in category else None
+            for category in self.categories.get("categories", [])
+        ]
+        # Every distinct term in each category's subcategory tree, so a
+        # category none of whose subcategories can score is skipped in one pass
+        self._subcategory_all_terms = [
+            tuple(dict.fromkeys(self._subcategory_term_list(terms, []))) if terms is not None else None
+            for terms in self._subcategory_terms
+        ]
+    
+    def _subcategory_term_list(self, subcategories: Tuple["_SubcategoryTerms", ...], terms: List[str]) -> List[str]:
+        """Collect the lowercased names, descriptions and values of a subcategory tree."""
+        for subcategory in subcategories:
+            terms.append(subcategory.name)
+            if subcategory.description is not None:
+                terms.append(subcategory.description)
+            if subcategory.values is not None:
+                terms.extend(value_lc for _, value_lc in subcategory.values)
+            if subcategory.subcategories is not None:
+                self._subcategory_term_list(subcategory.subcategories, terms)
+        return terms
+    
+    def _prepare_subcategories(self, subcategories: List[Dict[str, Any]]) -> Tuple["_SubcategoryTerms", ...]:
+        """Lowercase the matchable text of a subcategory tree once, at load time."""
+        return tuple(
+            _SubcategoryTerms(
+                subcategory=subcategory,
+                name=subcategory["name"].lower(),
+                description=subcategory["description"].lower() if "description" in subcategory else None,
+                values=tuple((value, value.lower()) for value in subcategory["values"]) if "values" in subcategory else None,
+                subcategories=self._prepare_subcategories(subcategory["subcategories"]) if "subcategories" in subcategory else None
+            )
+            for subcategory in subcategories
+        )
+    
+    def _match_category_subcategories(self, index: int, all_text: str, max_subcategories: int) -> List[Dict[str, Any]]:
+        """Match the subcategories of a top-level category, if any of them can score."""
+        all_terms = self._subcategory_all_terms[index]
+        if all_terms is None or not any(term in all_text for term in all_terms):
+            return []
+        return self._match_subcategories(self._subcategory_terms[index], all_text, max_subcategories)
+    
     def _match_subcategories(
         self, 
-        category: Dict[str, Any],
+        subcategories: Optional[Tuple["_SubcategoryTerms", ...]],
         all_text: str,
         max_subcategories: int
     ) -> List[Dict[str, Any]]:
         """Match subcategories based on text."""
         subcategory_scores = []
         
-        if "subcategories" not in category:
+        if subcategories is None:
             return []
             
-        for subcategory in category["subcategories"]:
+        for terms in subcategories:
+            subcategory = terms.subcategory
             score = 0
             # Match subcategory name
-            if subcategory["name"].lower() in all_text:
+            if terms.name in all_text:
                 score += 5
             
             # Match subcategory description if available
-            if "description" in subcategory and subcategory["description"].lower() in all_text:
+            if terms.description is not None and terms.description in all_text:
                 score += 3
                 
             # Match values if available
-            if "values" in subcategory:
-                for value in subcategory["values"]:
-                    if value.lower() in all_text:
-                        score += 2
+            matched_values = []
+            if terms.values is not None:
+                matched_values = [value for value, value_lc in terms.values if value_lc in all_text]
+                score += 2 * len(matched_values)
             
             # Recursively match nested subcategories if any
             nested_subcategories = []
-            if "subcategories" in subcategory:
-                nested_subcategories = self._match_subcategories(subcategory, all_text, max_subcategories)
+            if terms.subcategories is not None:
+                nested_subcategories = self._match_subcategories(terms.subcategories, all_text, max_subcategories)
                 
             if score > 0 or nested_subcategories:
-                subcategory_data = {
-                    "name": subcategory["name"],
-                    "description": subcategory.get("description", ""),
-                    "score": score
-                }
-                
-                if nested_subcategories:
-                    subcategory_data["subcategories"] = nested_subcategories
-                    
-                if "values" in subcategory:
-                    # Find matched values
-                    matched_values = [v for v in subcategory["values"] if v.lower() in all_text]
-                    if matched_values:
-                        subcategory_data["matched_values"] = matched_values
-                
-                subcategory_scores.append(subcategory_data)
+                subcategory_scores.append(_SubcategoryScore(subcategory, score, nested_subcategories, matched_values))
         
-        # Sort by score and take the top subcategories
-        subcategory_scores.sort(key=lambda x: x["score"], reverse=True)
-        return subcategory_scores[:max_subcategories]
+        # Take the top subcategories by score without sorting the whole list,
+        # and only build result dicts for those
+        top_scores = heapq.nlargest(max_subcategories, subcategory_scores, key=attrgetter("score"))
+        return [subcategory_score.to_dict() for subcategory_score in top_scores]
     
-    def _get_keywords_for_category(self, category_name: str) -> List[str]:
+    def _get_keywords_for_category(self, category_name: str) -> Tuple[str, ...]:
         """
         Get related keywords for a category.
         
         In a real implementation, this would be more sophisticated,
         possibly using a precomputed mapping or embedding similarity.
         """
-        # Basic keyword mapping
-        keyword_map = {
-            "Demographics": ["age", "gender", "education", "marital status", "ethnicity"],
-            "Financial": ["money", "income", "wealth", "finance", "investment", "budget"],
-            "Home": ["house", "apartment", "residence", "property", "rent", "mortgage"],
-            "Life Events": ["wedding", "marriage", "engagement", "birthday", "anniversary", "graduation"],
-            "Interests": ["hobby", "passion", "activity", "entertainment", "leisure"],
-            "Shopping and Fashion": ["clothes", "style", "trend", "retail", "purchase", "buy"],
-            "Technology": ["tech", "gadget", "device", "digital", "electronic", "computer"],
-            "Behaviors": ["habit", "pattern", "routine", "lifestyle", "behavior"]
-        }
-        
-        return keyword_map.get(category_name, [])
+        return _KEYWORD_MAP.get(category_name, ())
     
     def _generate_audience_segments(self, matched_categories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -421,38 +647,33 @@ class CategoryTreeTool(Tool):
             
             logger.info(f"Creating segments for category: {category_name} with {len(subcategories)} subcategories")
             
-            # Create a primary segment for this category
-            primary_segment = {
-                "name": f"{category_name} Enthusiasts",
-                "description": f"People interested in {category_name.lower()} products and services",
-                "targeting_criteria": [
-                    {
-                        "type": "interest",
-                        "category": category_name
-                    }
-                ]
-            }
+            # Targeting criteria for the primary segment of this category
+            targeting_criteria = [
+                {
+                    "type": "interest",
+                    "category": category_name
+                }
+            ]
             
             # Add subcategory criteria
             for subcategory in subcategories:
                 subcategory_name = subcategory["name"]
                 
-                # Add criteria based on subcategory
-                primary_segment["targeting_criteria"].append({
+                # Add criteria based on subcategory, then on its matched values if available
+                targeting_criteria.append({
                     "type": "interest",
                     "category": category_name,
                     "subcategory": subcategory_name
                 })
-                
-                # Add criteria based on matched values if available
-                if "matched_values" in subcategory:
-                    for value in subcategory["matched_values"]:
-                        primary_segment["targeting_criteria"].append({
-                            "type": "interest",
-                            "category": category_name,
-                            "subcategory": subcategory_name,
-                            "value": value
-                        })
+                targeting_criteria.extend(
+                    {
+                        "type": "interest",
+                        "category": category_name,
+                        "subcategory": subcategory_name,
+                        "value": value
+                    }
+                    for value in subcategory.get("matched_values", ())
+                )
                 
                 # Create a specialized segment for notable subcategories
                 if subcategory.get("score", 0) > 3:
@@ -474,157 +695,92 @@ class CategoryTreeTool(Tool):
                     }
                     audience_segments.append(segment)
             
-            audience_segments.append(primary_segment)
+            # Create a primary segment for this category
+            audience_segments.append({
+                "name": f"{category_name} Enthusiasts",
+                "description": f"People interested in {category_name.lower()} products and services",
+                "targeting_criteria": targeting_criteria
+            })
             
             # Create additional audience segments based on the category
-            if "Technology" in category_name or "Electronics" in category_name:
-                audience_segments.append({
-                    "name": "Tech Early Adopters",
-                    "description": "People who seek out the latest technology products and innovations",
-                    "targeting_criteria": [
-                        {
-                            "type": "interest",
-                            "category": category_name
-                        },
-                        {
-                            "type": "behavior",
-                            "category": "Technology",
-                            "value": "Early Adopter" 
-                        }
-                    ]
-                })
-            
-            if "Fashion" in category_name or "Clothing" in category_name or "Apparel" in category_name:
-                audience_segments.append({
-                    "name": "Fashion-Forward Consumers",
-                    "description": "Style-conscious consumers who follow trends and fashion innovations",
-                    "targeting_criteria": [
-                        {
-                            "type": "interest",
-                            "category": category_name
-                        },
-                        {
-                            "type": "demographic",
-                            "category": "Shopping Behavior",
-                            "value": "Trend-Driven"
-                        }
-                    ]
-                })
-            
-            if "Home" in category_name or "Furniture" in category_name or "Decor" in category_name:
-                audience_segments.append({
-                    "name": "Home Improvement Enthusiasts",
-                    "description": "People actively enhancing or renovating their living spaces",
-                    "targeting_criteria": [
-                        {
-                            "type": "interest",
-                            "category": category_name
-                        },
-                        {
-                            "type": "life_event",
-                            "category": "Home",
-                            "value": "Moving/Renovating"
-                        }
-                    ]
-                })
+            for pattern, template in _SEGMENT_RULES:
+                if pattern.search(category_name):
+                    audience_segments.append({
+                        "name": template["name"],
+                        "description": template["description"],
+                        "targeting_criteria": [
+                            {
+                                "type": "interest",
+                                "category": category_name
+                            },
+                            dict(template["criterion"])
+                        ]
+                    })
         
         # Always add these general segments if we have few specific segments
         if len(audience_segments) < 3:
             logger.info("Adding general audience segments due to limited specific segments")
-            
-            # Add a value-conscious segment
-            audience_segments.append({
-                "name": "Value-Conscious Shoppers",
-                "description": "Price-sensitive consumers who compare options before purchasing",
-                "targeting_criteria": [
-                    {
-                        "type": "behavior",
-                        "category": "Shopping Behavior",
-                        "value": "Price Comparison"
-                    },
-                    {
-                        "type": "behavior",
-                        "category": "Shopping Behavior",
-                        "value": "Coupon User"
-                    }
-                ]
-            })
-            
-            # Add a convenience shopper segment
-            audience_segments.append({
-                "name": "Convenience Shoppers",
-                "description": "Consumers who prioritize ease of purchase and quick delivery",
-                "targeting_criteria": [
-                    {
-                        "type": "behavior",
-                        "category": "Shopping Behavior",
-                        "value": "Online Shopper"
-                    },
-                    {
-                        "type": "behavior",
-                        "category": "Shopping Behavior",
-                        "value": "Fast Shipping"
-                    }
-                ]
-            })
-            
-            # Add a quality-focused segment
-            audience_segments.append({
-                "name": "Quality-Focused Consumers",
-                "description": "Shoppers who prioritize product quality and durability over price",
-                "targeting_criteria": [
-                    {
-                        "type": "behavior",
-                        "category": "Shopping Behavior",
-                        "value": "Quality-Driven"
-                    },
-                    {
-                        "type": "demographic",
-                        "category": "Income",
-                        "value": "Above Average"
-                    }
-                ]
-            })
+            audience_segments.extend(
+                {
+                    "name": template["name"],
+                    "description": template["description"],
+                    "targeting_criteria": [dict(criterion) for criterion in template["targeting_criteria"]]
+                }
+                for template in _GENERAL_SEGMENTS
+            )
         
         logger.info(f"Generated {len(audience_segments)} audience segments")
         return audience_segments
     
-    def _get_all_top_level_categories(self) -> List[Dict[str, Any]]:
-        """Get all top-level categories with descriptions for LLM to choose from."""
-        logger.info("Getting all top-level categories")
-        top_categories = []
+    def _build_explore_cache(self) -> None:
+        """
+        Build the listings returned by the exploration modes.
         
-        for category in self.categories.get("categories", []):
-            top_categories.append({
+        The category tree doesn't change after loading, so both listings are
+        built and sorted once here instead of on every call.
+        """
+        top_categories = [
+            {
                 "name": category["name"],
                 "description": category.get("description", ""),
                 "has_subcategories": "subcategories" in category and len(category["subcategories"]) > 0
-            })
-        
+            }
+            for category in self.categories.get("categories", [])
+        ]
         # Sort alphabetically for consistent presentation
         top_categories.sort(key=lambda x: x["name"])
+        self._top_level_categories = tuple(top_categories)
+        
+        subcategories_by_name = {}
+        for category in self.categories.get("categories", []):
+            # If a name repeats, the first category with that name is the one listed
+            if category["name"] in subcategories_by_name:
+                continue
+            subcategories = [
+                {
+                    "name": subcategory["name"],
+                    "description": subcategory.get("description", ""),
+                    "has_subcategories": "subcategories" in subcategory and len(subcategory["subcategories"]) > 0,
+                    "values": subcategory.get("values", [])
+                }
+                for subcategory in category.get("subcategories", [])
+            ]
+            subcategories.sort(key=lambda x: x["name"])
+            subcategories_by_name[category["name"]] = tuple(subcategories)
+        self._subcategories_by_name = subcategories_by_name
+    
+    def _get_all_top_level_categories(self) -> List[Dict[str, Any]]:
+        """Get all top-level categories with descriptions for LLM to choose from."""
+        # Copies, so a caller editing the result can't change the shared listing
+        top_categories = [dict(category) for category in self._top_level_categories]
         logger.info(f"Found {len(top_categories)} top-level categories")
         return top_categories
     
     def _get_subcategories_for_category(self, category_name: str) -> List[Dict[str, Any]]:
         """Get subcategories for a specific parent category."""
-        logger.info(f"Looking for subcategories of: {category_name}")
-        subcategories = []
-        
-        # Find the specified category
-        for category in self.categories.get("categories", []):
-            if category["name"] == category_name:
-                # Found the category, extract its subcategories
-                for subcategory in category.get("subcategories", []):
-                    subcategories.append({
-                        "name": subcategory["name"],
-                        "description": subcategory.get("description", ""),
-                        "has_subcategories": "subcategories" in subcategory and len(subcategory["subcategories"]) > 0,
-                        "values": subcategory.get("values", [])
-                    })
-                break
-        
-        # Sort alphabetically for consistent presentation
-        subcategories.sort(key=lambda x: x["name"])
+        subcategories = [
+            dict(subcategory, values=list(subcategory["values"]))
+            for subcategory in self._subcategories_by_name.get(category_name, ())
+        ]
         logger.info(f"Found {len(subcategories)} subcategories for {category_name}")
-        return subcategories 
\ No newline at end of file
+        return subcategories
@@ -18,6 +18,17 @@ from tools.base import Tool, ToolResult
 
 logger = logging.getLogger(__name__)
 
+# Patterns for pulling product details out of scraped markdown, compiled once
+_PRICE_RES = [
+    re.compile(r'\$\d+(?:\.\d{2})?'),  # $XX.XX
+    re.compile(r'Price:?\s*\$?\d+(?:\.\d{2})?'),  # Price: $XX.XX
+    re.compile(r'Cost:?\s*\$?\d+(?:\.\d{2})?')  # Cost: $XX.XX
+]
+# Bullet markers for feature lines, and how many features to keep
+_BULLET_CHARS = '-•*'
+_MAX_FEATURES = 10
+_PARA_RE = re.compile(r'\n\s*\n')
+
 class FirecrawlerTool(Tool):
     """Tool for analyzing product websites using Firecrawler"""
     
@@ -176,34 +187,38 @@ class FirecrawlerTool(Tool):
             if "content" in scrape_result:
                 content = scrape_result["content"]
                 
-                # Look for price patterns
-                price_patterns = [
-                    r'\$\d+(?:\.\d{2})?',  # $XX.XX
-                    r'Price:?\s*\$?\d+(?:\.\d{2})?',  # Price: $XX.XX
-                    r'Cost:?\s*\$?\d+(?:\.\d{2})?'  # Cost: $XX.XX
-                ]
-                
-                for pattern in price_patterns:
-                    prices = re.findall(pattern, content)
-                    if prices:
-                        product_data["price"] = prices[0]
+                # Look for price patterns, in order of preference; only the
+                # first match is kept, so stop scanning as soon as one is found
+                for pattern in _PRICE_RES:
+                    price_match = pattern.search(content)
+                    if price_match:
+                        product_data["price"] = price_match.group(0)
                         break
                 
-                # Extract features (assuming bullet points or numbered lists)
-                feature_patterns = [
-                    r'[-•*]\s*(.*?)(?=[-•*]|\n|$)',  # Bullet points
-                    r'\d+\.\s*(.*?)(?=\d+\.|\n|$)'   # Numbered points
-                ]
-                
+                # Extract features from lines that are bullet points or
+                # numbered list items, stopping once we have enough
                 features = []
-                for pattern in feature_patterns:
-                    found_features = re.findall(pattern, content)
-                    features.extend([f.strip() for f in found_features if f.strip()])
+                for line in content.split('\n'):
+                    stripped = line.lstrip()
+                    # A list marker is followed by whitespace, which rules out
+                    # lines like '-5% off', '**Bold**' or '3.14 GHz'
+                    if stripped[:1] in _BULLET_CHARS and stripped[1:2].isspace():
+                        feature = stripped[2:].strip()
+                    else:
+                        number, dot, rest = stripped.partition('.')
+                        if not (dot and number.isdigit() and rest[:1].isspace()):
+                            continue
+                        feature = rest.strip()
+                    
+                    if feature:
+                        features.append(feature)
+                        if len(features) >= _MAX_FEATURES:
+                            break
                 
-                product_data["features"] = features[:10]  # Limit to 10 features
+                product_data["features"] = features
                 
                 # Basic description extraction (first few paragraphs)
-                paragraphs = re.split(r'\n\s*\n', content)
+                paragraphs = _PARA_RE.split(content)
                 if paragraphs:
                     product_data["description"] = paragraphs[0].strip()
             
@@ -40,8 +40,8 @@ def tail_file(file_path, filter_pattern=None):
         print(f"Error: {str(e)}")
 
 if __name__ == "__main__":
-    # Default to app.log if no file is specified
-    log_file = "app.log"
+    # Default to api.log if no file is specified
+    log_file = "api.log"
     filter_pattern = None
     
     # Parse command line arguments
@@ -1,20 +1,17 @@
 import os
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 import json
 from openai import AsyncOpenAI
 from dotenv import load_dotenv
 
 from tools.base import ToolResult
 from tools import ToolRegistry
+import logging_config
 
-# Set up logging - only if not already configured elsewhere
-if not logging.getLogger().handlers:
-    logging.basicConfig(
-        level=logging.INFO, 
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+# Set up logging - a no-op if api.py or run_server.py already did
+logging_config.configure_once()
 logger = logging.getLogger(__name__)
 
 # Load environment variables
@@ -63,6 +60,13 @@ class WorkflowOrchestrator:
         
         # Workflow state
         logger.info("Setting up initial workflow state")
+        # Incremented on every state change so readers can cache serialized snapshots
+        self.state_version = 0
+        # Created lazily on the event loop by wait_for_state_change
+        self._state_changed: Optional[asyncio.Event] = None
+        # Set while a message is being processed for a streaming client
+        self._on_delta: Optional[Callable[[str], None]] = None
+        self._streamed_any = False
         self.conversation_history = []
         self.current_workflow_stage = "initial"
         self.product_data = {}
@@ -164,6 +168,40 @@ class WorkflowOrchestrator:
         }
         logger.info("WorkflowOrchestrator initialization complete")
     
+    @property
+    def current_workflow_stage(self) -> str:
+        """The current stage of the workflow"""
+        return self._current_workflow_stage
+    
+    @current_workflow_stage.setter
+    def current_workflow_stage(self, stage: str) -> None:
+        self._current_workflow_stage = stage
+        self.mark_state_changed()
+    
+    def mark_state_changed(self) -> None:
+        """Bump the state version and wake anyone waiting in wait_for_state_change"""
+        self.state_version += 1
+        if self._state_changed is not None:
+            self._state_changed.set()
+            self._state_changed = None
+    
+    async def wait_for_state_change(self, version: int, timeout: float) -> bool:
+        """
+        Wait until the state version differs from `version`.
+        
+        Returns:
+            True if the state changed, False if the timeout expired first
+        """
+        if self.state_version != version:
+            return True
+        if self._state_changed is None:
+            self._state_changed = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._state_changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
     async def start_conversation(self) -> str:
         """Start the conversation with an initial greeting"""
         logger.info("Starting new conversation")
@@ -172,19 +210,59 @@ class WorkflowOrchestrator:
         
         logger.info("Generating initial greeting message")
         initial_message = await self._get_ai_response("Hi there! I'm Audience Andy. Share a product URL with me, and I'll help you identify target audiences and marketing strategies for it.")
+        self.mark_state_changed()
         logger.info("Conversation started")
         return initial_message
     
-    async def process_message(self, user_message: str) -> str:
+    async def process_message(self, user_message: str, on_delta: Optional[Callable[[str], None]] = None) -> str:
         """
         Process a user message and advance the workflow.
         
         Args:
             user_message: The message from the user
+            on_delta: Optional callback that receives the response text piece by
+                piece as the model generates it
             
         Returns:
             The assistant's response
         """
+        self._on_delta = on_delta
+        self._streamed_any = False
+        try:
+            return await self._route_message(user_message)
+        finally:
+            self._on_delta = None
+            # Data is written in place while handling the message, so mark the state as changed
+            self.mark_state_changed()
+    
+    async def analyze_url(self, url: str) -> str:
+        """
+        Run the whole analysis for a product URL in one call.
+        
+        Each stage hands straight on to the next, and stage changes are published
+        through `mark_state_changed`, so partial results can be followed on the
+        status stream while this runs.
+        
+        Args:
+            url: The product URL to analyze
+            
+        Returns:
+            The combined responses of all stages
+        """
+        message = f"Analyze {url}"
+        self.conversation_history.append({"role": "user", "content": message})
+        self.current_workflow_stage = "initial"
+        self.product_data = {}
+        self.market_data = {}
+        self.category_data = {}
+        self.final_results = {}
+        try:
+            return await self._handle_url_analysis(message)
+        finally:
+            self.mark_state_changed()
+    
+    async def _route_message(self, user_message: str) -> str:
+        """Dispatch a user message to the handler for the current workflow stage"""
         logger.info(f"Processing user message in stage: {self.current_workflow_stage}")
         
         # Log current data state for debugging
@@ -931,14 +1009,16 @@ class WorkflowOrchestrator:
             messages.extend(self.conversation_history[-10:])
             
             logger.info("Calling OpenAI API for chat completion")
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-mini",  # Use the appropriate GPT-4 model
-                messages=messages,
-                temperature=0.7,
-                max_tokens=1000,
-            )
-            
-            ai_message = response.choices[0].message.content
+            if self._on_delta is None:
+                response = await self.client.chat.completions.create(
+                    model="gpt-4o-mini",  # Use the appropriate GPT-4 model
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=1000,
+                )
+                ai_message = response.choices[0].message.content
+            else:
+                ai_message = await self._stream_ai_response(messages)
             logger.info("Received AI response")
             
             # Add AI response to conversation history
@@ -950,6 +1030,29 @@ class WorkflowOrchestrator:
             logger.error(f"Error getting AI response: {str(e)}", exc_info=True)
             return f"I'm having trouble generating a response. Please try again. Error: {str(e)}"
     
+    async def _stream_ai_response(self, messages: List[Dict[str, str]]) -> str:
+        """Get a chat completion as a stream, passing each piece of text to the delta callback"""
+        stream = await self.client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=messages,
+            temperature=0.7,
+            max_tokens=1000,
+            stream=True,
+        )
+        
+        # Stage handlers join consecutive responses with a blank line, so do the same here
+        if self._streamed_any:
+            self._on_delta("\n\n")
+        self._streamed_any = True
+        
+        parts = []
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                delta = chunk.choices[0].delta.content
+                parts.append(delta)
+                self._on_delta(delta)
+        return "".join(parts)
+    
     async def _generate_marketing_strategies(self, prompt: str) -> List[Dict[str, Any]]:
         """Generate marketing strategies using GPT-4"""
         try: